@@ -38,6 +38,7 @@ except ImportError as error:
     exit(1)
 
 import argparse
+import multiprocessing
 import os.path
 import signal
 import sys
@@ -81,12 +82,31 @@ def __arguments():
                         type=int, default=0)
     parser.add_argument("-c", "--conf", help="Load a config file",
                         default=None)
+    parser.add_argument("-b", "--bands",
+                        help="Report band power (MHz), e.g. 145.0-145.2,433-434",
+                        default=None)
+    parser.add_argument("-D", "--daemon",
+                        help="Scan continuously until stopped, rotating the output file",
+                        action='store_true')
+    parser.add_argument("-t", "--rotate",
+                        help="Daemon output rotation interval (minutes)",
+                        type=int, default=60)
+    parser.add_argument("-n", "--window",
+                        help="Daemon sweeps kept in memory and per output file",
+                        type=int, default=100)
+    parser.add_argument("-j", "--jobs",
+                        help="Number of processing threads (default: CPU count)",
+                        type=int, default=None)
+    parser.add_argument("-m", "--multi",
+                        help="Split the range across all local devices",
+                        action='store_true')
     group = parser.add_mutually_exclusive_group()
     group.add_argument("-i", "--index", help="Device index (from 0)", type=int,
                        default=0)
     group.add_argument("-r", "--remote", help="Server IP and port", type=str)
     types = File.get_type_pretty(File.Types.SAVE)
-    types += File.get_type_pretty(File.Types.PLOT)
+    types += ', ' + File.get_type_pretty(File.Types.PLOT)
+    types += ', ' + File.get_type_pretty(File.Types.IMAGE)
     m_help = 'Output file (' + types + ')'
     parser.add_argument("file", help=m_help, nargs='?')
     m_args = parser.parse_args()
@@ -115,6 +135,7 @@ def __arguments():
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     print(APP_NAME + "\n")
 
     isGui, args = __arguments()
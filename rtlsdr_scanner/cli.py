@@ -24,22 +24,31 @@
 #
 
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import os
+import signal
 import sys
-from queue import Queue
-from threading import Thread
+from queue import Queue, Empty
 import threading
 import time
 from urllib.parse import urlparse
 
 from rtlsdr_scanner.constants import SAMPLE_RATE
 from rtlsdr_scanner.devices import DeviceRTL, get_devices_rtl
-from rtlsdr_scanner.events import Event
+from rtlsdr_scanner.events import Event, EventThread, post_event
 from rtlsdr_scanner.file import save_plot, export_plot, ScanInfo, File
-from rtlsdr_scanner.location import ThreadLocation
-from rtlsdr_scanner.misc import nearest, calc_real_dwell, next_2_to_pow, get_dwells
-from rtlsdr_scanner.scan import ThreadScan, update_spectrum, ThreadProcess
+from rtlsdr_scanner.location import ThreadLocation, LocationTrack
+from rtlsdr_scanner.misc import nearest, calc_real_dwell, next_2_to_pow, get_dwells, \
+    parse_bands, format_band
+from rtlsdr_scanner.render import render_spectrum
+from rtlsdr_scanner.scan import ThreadScan, update_spectrum, ThreadProcess, \
+    ScanCoordinator
 from rtlsdr_scanner.settings import Settings
+from rtlsdr_scanner.spectrum import BandPower
+
+
+EVENT_TIMEOUT = 0.5
+PROGRESS_INTERVAL = 0.5
 
 
 class Cli:
@@ -57,19 +66,32 @@ class Cli:
         _null, ext = os.path.splitext(args.file)
 
         self.lock = threading.Lock()
+        self.stopScan = threading.Event()
+
+        self.daemon = args.daemon
+        self.rotate = args.rotate * 60
+        self.window = args.window
+        self.segmentStart = time.time()
+        self.fullName = os.path.join(directory, filename)
 
         self.stepsTotal = 0
         self.steps = 0
+        self.scanFinished = False
+        self.progressTime = 0
 
         self.spectrum = OrderedDict()
         self.locations = OrderedDict()
+        self.track = LocationTrack()
         self.settings = Settings(load=False)
 
-        self.queueNotify = Queue()
+        self.queue = Queue()
         self.queueScan = Queue()
-        self.queueLocation = Queue()
+        self.pool = ThreadPoolExecutor(args.jobs or os.cpu_count() or 1)
 
         self.threadLocation = None
+        self.bands = []
+        self.devices = []
+        self.ranges = {}
 
         error = None
 
@@ -81,10 +103,20 @@ class Cli:
             error = "Dwell should equal lower than {}s".format(max(get_dwells()[1::2]))
         elif nfft <= 0:
             error = "FFT bins should be positive"
-        elif ext != ".rfs" and File.get_type_index(ext) == -1:
+        elif self.rotate <= 0:
+            error = "Rotation interval should be positive"
+        elif self.window <= 0:
+            error = "Window should be positive"
+        elif args.jobs is not None and args.jobs <= 0:
+            error = "Jobs should be positive"
+        elif args.multi and remote is not None:
+            error = "Multiple devices cannot be used with a remote server"
+        elif ext != ".rfs" and File.get_type_index(ext) == -1 and \
+                File.get_type_index(ext, File.Types.IMAGE) == -1:
             error = "File extension should be "
-            error += File.get_type_pretty(File.Types.SAVE)
-            error += File.get_type_pretty(File.Types.PLOT)
+            error += File.get_type_pretty(File.Types.SAVE) + ', '
+            error += File.get_type_pretty(File.Types.PLOT) + ', '
+            error += File.get_type_pretty(File.Types.IMAGE)
         else:
             device = DeviceRTL()
             if remote is None:
@@ -117,6 +149,12 @@ class Cli:
                 else:
                     error = 'Cannot find {}'.format(args.conf)
 
+            if args.bands is not None:
+                try:
+                    self.bands = parse_bands(args.bands)
+                except ValueError:
+                    error = 'Bands should be ranges in MHz, e.g. 145.0-145.2,433-434'
+
             if end - 1 < start:
                 end = start + 1
             if remote is None:
@@ -134,11 +172,24 @@ class Cli:
         self.settings.dwell = calc_real_dwell(dwell)
         self.settings.scanDelay = args.delay
         self.settings.nfft = nfft
+        self.settings.indexRtl = index
+        self.devices = [index]
+        if args.multi:
+            self.devices = list(range(len(self.settings.devicesRtl)))
+            for device in self.settings.devicesRtl:
+                device.gain = nearest(gain, device.gains)
+                device.lo = lo
         self.settings.devicesRtl[index].gain = gain
         self.settings.devicesRtl[index].lo = lo
 
         print("{} - {}MHz".format(start, end))
-        print("{} Sweeps".format(sweeps))
+        if self.daemon:
+            print("Continuous, rotating every {} minutes or {} sweeps".
+                  format(args.rotate, self.window))
+            signal.signal(signal.SIGTERM, self.__on_signal)
+            signal.signal(signal.SIGINT, self.__on_signal)
+        else:
+            print("{} Sweeps".format(sweeps))
         print("{}dB Gain".format(gain))
         print("{}s Dwell".format(self.settings.dwell))
         print("{} FFT points".format(nfft))
@@ -146,41 +197,94 @@ class Cli:
         if remote is not None:
             print(remote)
         else:
-            print(self.settings.devicesRtl[index].name)
+            for device in self.devices:
+                print(self.settings.devicesRtl[device].name)
 
         if len(self.settings.devicesGps):
             print('Using GPS configuration \'{}\''.format(self.settings.devicesGps[0].name))
-            self.threadLocation = ThreadLocation(self.queueLocation,
-                                                 self.settings.devicesGps[0])
+            self.threadLocation = ThreadLocation(self.queue,
+                                                 self.settings.devicesGps[0],
+                                                 rate=self.settings.gpsRate)
             if not self.__gps_wait():
                 self.__gps_stop()
                 exit(1)
 
         self.__scan(sweeps, self.settings, index)
 
-        fullName = os.path.join(directory, filename)
-        if ext == ".rfs":
-            scanInfo = ScanInfo()
-            scanInfo.set_from_settings(self.settings)
-
-            save_plot(fullName, scanInfo, self.spectrum, self.locations)
+        if self.daemon:
+            self.__rotate(True)
         else:
-            exportType = File.get_type_index(ext)
-            export_plot(fullName, exportType, self.spectrum)
+            self.__save(self.fullName)
+            if len(self.bands):
+                self.__print_bands()
 
         self.__gps_stop()
+        self.pool.shutdown()
         print("Done")
 
+    def __on_signal(self, _signal, _frame):
+        self.stopScan.set()
+
+    def __save(self, fullName):
+        _null, ext = os.path.splitext(fullName)
+        with self.lock:
+            if ext == ".rfs":
+                scanInfo = ScanInfo()
+                scanInfo.set_from_settings(self.settings)
+
+                save_plot(fullName, scanInfo, self.spectrum, self.locations)
+            elif File.get_type_index(ext, File.Types.IMAGE) != -1:
+                imageType = File.get_type_index(ext, File.Types.IMAGE)
+                render_spectrum(fullName, self.spectrum, self.settings,
+                                imageType=imageType)
+            else:
+                exportType = File.get_type_index(ext)
+                export_plot(fullName, exportType, self.spectrum)
+
+    def __rotate(self, force=False):
+        with self.lock:
+            sweeps = len(self.spectrum)
+        if not sweeps:
+            return
+        if not force and sweeps < self.window and \
+                time.time() - self.segmentStart < self.rotate:
+            return
+
+        name, ext = os.path.splitext(self.fullName)
+        fullName = '{}_{}{}'.format(name,
+                                    time.strftime('%Y%m%d-%H%M%S',
+                                                  time.localtime(self.segmentStart)),
+                                    ext)
+        print('\nSaving {} sweeps to {}'.format(sweeps, fullName))
+        self.__save(fullName)
+        if len(self.bands):
+            self.__print_bands()
+
+        with self.lock:
+            self.track.trim(max(self.spectrum))
+            self.spectrum.clear()
+            self.locations.clear()
+        self.segmentStart = time.time()
+
+    def __wait_event(self, timeout):
+        try:
+            event = self.queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+        return self.__process_event(event)
+
     def __gps_wait(self):
         print('\nWaiting for GPS fix: {}'.format(self.settings.devicesGps[0].get_desc()))
 
-        while True:
-            if not self.queueLocation.empty():
-                status = self.__process_event(self.queueLocation)
-                if status == Event.LOC:
-                    return True
-                elif status == Event.LOC_ERR:
-                    return False
+        while not self.stopScan.is_set():
+            status = self.__wait_event(EVENT_TIMEOUT)
+            if status == Event.LOC:
+                return True
+            elif status == Event.LOC_ERR:
+                return False
+
+        return False
 
     def __gps_stop(self):
         if self.threadLocation and self.threadLocation.is_alive():
@@ -190,24 +294,54 @@ class Cli:
         samples = settings.dwell * SAMPLE_RATE
         samples = next_2_to_pow(int(samples))
 
-        for sweep in range(0, sweeps):
+        sdrs = {}
+        sweep = 0
+        while not self.stopScan.is_set() and (self.daemon or sweep < sweeps):
             print('\nSweep {}:'.format(sweep + 1))
-            threadScan = ThreadScan(self.queueNotify, self.queueScan, None,
-                                    settings, index, samples, False)
-            while threadScan.is_alive() or self.steps > 0:
-                if not self.queueNotify.empty():
-                    self.__process_event(self.queueNotify)
-                if not self.queueLocation.empty():
-                    self.__process_event(self.queueLocation)
-            if self.settings.scanDelay > 0 and sweep < sweeps - 1:
+            self.scanFinished = False
+            if len(self.devices) > 1:
+                threadScan = ScanCoordinator(self.queue, self.queueScan,
+                                             settings, self.devices, samples,
+                                             sdrs)
+            else:
+                threadScan = ThreadScan(self.queue, self.queueScan,
+                                        sdrs.get(index),
+                                        settings, index, samples, False)
+            self.ranges = threadScan.get_ranges()
+            while (threadScan.is_alive() and not self.scanFinished) or \
+                    self.steps > 0:
+                if self.stopScan.is_set():
+                    self.__abort(threadScan)
+                    break
+                self.__wait_event(EVENT_TIMEOUT)
+            sdrs.update(threadScan.get_sdrs())
+            self.__geotag()
+            if self.daemon:
+                self.__rotate()
+            if self.settings.scanDelay > 0 and not self.stopScan.is_set() and \
+                    (self.daemon or sweep < sweeps - 1):
                 print('\nDelaying {}s'.format(self.settings.scanDelay))
-                time.sleep(self.settings.scanDelay)
-            threadScan.rtl_close()
+                self.stopScan.wait(self.settings.scanDelay)
             print("")
+            sweep += 1
+        for sdr in sdrs.values():
+            sdr.close()
         print("")
 
-    def __process_event(self, queue):
-        event = queue.get()
+    def __abort(self, threadScan):
+        print('\nStopping')
+        threadScan.abort()
+        threadScan.join()
+        while self.__wait_event(EVENT_TIMEOUT * 2) is not None:
+            pass
+        self.steps = 0
+
+    def __on_done(self, future):
+        if not future.cancelled() and future.exception() is not None:
+            post_event(self.queue, EventThread(Event.ERROR, 0,
+                                               future.exception()))
+
+    def __process_event(self, event):
         status = event.data.get_status()
         arg1 = event.data.get_arg1()
         arg2 = event.data.get_arg2()
@@ -219,49 +353,77 @@ class Cli:
             self.steps = self.stepsTotal
         elif status == Event.INFO:
             if arg2 != -1:
-                self.settings.devicesRtl[self.settings.indexRtl].tuner = arg2
+                self.settings.devicesRtl[arg1].tuner = arg2
         elif status == Event.DATA:
-            cal = self.settings.devicesRtl[self.settings.indexRtl].calibration
-            levelOff = self.settings.devicesRtl[self.settings.indexRtl].levelOff
-            freq, scan = self.queueScan.get()
-            process = ThreadProcess(self.queueNotify,
+            freq, scan, device = self.queueScan.get()
+            cal = self.settings.devicesRtl[device].calibration
+            levelOff = self.settings.devicesRtl[device].levelOff
+            process = ThreadProcess(self.queue,
                                     freq, scan, cal, levelOff,
                                     self.settings.nfft,
                                     self.settings.overlap,
-                                    self.settings.winFunc)
-            process.start()
+                                    self.settings.winFunc,
+                                    device)
+            future = self.pool.submit(process.run)
+            future.add_done_callback(self.__on_done)
             self.__progress()
         elif status == Event.ERROR:
             print("Error: {}".format(arg2))
             exit(1)
         elif status == Event.PROCESSED:
-            offset = self.settings.devicesRtl[self.settings.indexRtl].offset
-            Thread(target=update_spectrum, name='Update',
-                   args=(self.queueNotify, self.lock,
-                         self.settings.start,
-                         self.settings.stop,
-                         arg1,
-                         offset,
-                         self.spectrum,
-                         not self.settings.retainScans,
-                         False)).start()
+            offset = self.settings.devicesRtl[arg2].offset
+            start, stop = self.ranges[arg2]
+            future = self.pool.submit(update_spectrum,
+                                      self.queue, self.lock,
+                                      start,
+                                      stop,
+                                      arg1,
+                                      offset,
+                                      self.spectrum,
+                                      not self.settings.retainScans,
+                                      False)
+            future.add_done_callback(self.__on_done)
         elif status == Event.UPDATED:
             self.__progress()
+        elif status in [Event.FINISHED, Event.STOPPED]:
+            self.scanFinished = True
         elif status == Event.LOC:
-            if len(self.spectrum) > 0:
-                self.locations[max(self.spectrum)] = (arg2[0],
-                                                      arg2[1],
-                                                      arg2[2])
+            self.track.add(*arg2)
         elif status == Event.LOC_ERR:
             print('Error: {}'.format(arg2))
             exit(1)
 
         return status
 
+    def __geotag(self):
+        with self.lock:
+            if len(self.spectrum):
+                latest = next(reversed(self.spectrum))
+                self.track.geotag(self.spectrum, self.locations,
+                                  (latest + time.time()) / 2.)
+
+    def __print_bands(self):
+        power = BandPower(self.spectrum)
+        if power.is_empty():
+            return
+
+        print("Band power:")
+        peaks, means, integrals = power.get_totals(self.bands)
+        for band, peak, mean, integral in zip(self.bands, peaks, means,
+                                              integrals):
+            print("\t{}: peak {:.2f}dB/Hz, mean {:.2f}dB/Hz,"
+                  " power {:.2f}dB".format(format_band(band), peak, mean,
+                                           integral))
+
     def __progress(self):
         self.steps -= 1
+        now = time.time()
+        if self.steps > 0 and now - self.progressTime < PROGRESS_INTERVAL:
+            return
+        self.progressTime = now
         comp = (self.stepsTotal - self.steps) * 100 / self.stepsTotal
         sys.stdout.write("\r{0:.1f}%".format(comp))
+        sys.stdout.flush()
 
 
 if __name__ == '__main__':
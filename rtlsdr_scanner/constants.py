@@ -57,7 +57,13 @@ DISPLAY = ["Plot", 0,
            "3D Spectrogram", 2,
            "Status", 3,
            "Time Line", 4,
-           "Preview", 5]
+           "Preview", 5,
+           "Signals", 6]
+
+TIMELINE = ["Points", 0,
+            "Occupancy", 1,
+            "Noise floor", 2,
+            "Band power", 3]
 
 TUNER = ["Unknown",
          "Elonics E4000",
@@ -82,13 +88,17 @@ class Cal:
 
 
 class Display:
-    PLOT, SPECT, SURFACE, STATUS, TIMELINE, PREVIEW = range(6)
+    PLOT, SPECT, SURFACE, STATUS, TIMELINE, PREVIEW, SIGNALS = range(7)
 
 
 class Mode:
     SINGLE, CONTIN, MAX = range(3)
 
 
+class Timeline:
+    POINTS, OCCUPANCY, NOISE, POWER = range(4)
+
+
 class Plot:
     STR_FULL = 'Full'
     STR_PARTIAL = 'Partial'
@@ -24,7 +24,10 @@
 #
 from ctypes import c_ubyte, string_at
 
-import rtlsdr
+try:
+    import rtlsdr
+except ImportError:
+    rtlsdr = None
 import serial
 
 
@@ -111,6 +114,9 @@ def get_devices_rtl(currentDevices=None, statusBar=None):
         currentDevices = []
 
     devices = []
+    if rtlsdr is None:
+        return devices
+
     count = rtlsdr.librtlsdr.rtlsdr_get_device_count()
 
     for dev in range(0, count):
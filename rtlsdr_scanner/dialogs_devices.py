@@ -91,6 +91,10 @@ class DialogDevicesRTL(wx.Dialog):
         serverSizer.Add(self.buttonDel, 0, wx.ALL)
         self.__set_button_state()
 
+        self.checkMulti = wx.CheckBox(self, wx.ID_ANY, "Scan with all devices")
+        self.checkMulti.SetToolTip('Split the frequency range across all devices')
+        self.checkMulti.SetValue(settings.multiDevice)
+
         buttonOk = wx.Button(self, wx.ID_OK)
         buttonCancel = wx.Button(self, wx.ID_CANCEL)
         sizerButtons = wx.StdDialogButtonSizer()
@@ -102,6 +106,7 @@ class DialogDevicesRTL(wx.Dialog):
         self.devbox = wx.BoxSizer(wx.VERTICAL)
         self.devbox.Add(self.gridDev, 1, wx.ALL | wx.EXPAND, 10)
         self.devbox.Add(serverSizer, 0, wx.ALL | wx.EXPAND, 10)
+        self.devbox.Add(self.checkMulti, 0, wx.ALL | wx.EXPAND, 10)
         self.devbox.Add(sizerButtons, 0, wx.ALL | wx.EXPAND, 10)
 
         self.SetSizerAndFit(self.devbox)
@@ -255,6 +260,7 @@ class DialogDevicesRTL(wx.Dialog):
         self.__get_dev_grid()
         if self.__warn_duplicates():
             return
+        self.settings.multiDevice = self.checkMulti.GetValue()
         self.EndModal(wx.ID_OK)
 
     def __select_row(self, index):
@@ -293,6 +299,16 @@ class DialogDevicesGPS(wx.Dialog):
         self.checkGpsRetry.SetValue(settings.gpsRetry)
         self.checkGpsRetry.Enable(settings.gps)
 
+        textRate = wx.StaticText(self, label='Maximum fix rate (Hz)')
+        self.spinRate = wx.SpinCtrl(self, min=0, max=20,
+                                    initial=settings.gpsRate)
+        self.spinRate.SetToolTip('Limit how often positions are recorded'
+                                 ' (0 for every fix)')
+        self.spinRate.Enable(settings.gps)
+        sizerRate = wx.BoxSizer(wx.HORIZONTAL)
+        sizerRate.Add(textRate, 0, wx.ALIGN_CENTRE_VERTICAL | wx.RIGHT, 5)
+        sizerRate.Add(self.spinRate, 0, wx.ALL)
+
         self.gridDev = grid.Grid(self)
         self.gridDev.CreateGrid(len(self.devices), 5)
         self.gridDev.SetRowLabelSize(0)
@@ -329,6 +345,7 @@ class DialogDevicesGPS(wx.Dialog):
         self.devbox = wx.BoxSizer(wx.VERTICAL)
         self.devbox.Add(self.checkGps, 0, wx.ALL | wx.EXPAND, 10)
         self.devbox.Add(self.checkGpsRetry, 0, wx.ALL | wx.EXPAND, 10)
+        self.devbox.Add(sizerRate, 0, wx.ALL | wx.EXPAND, 10)
         self.devbox.Add(self.gridDev, 1, wx.ALL | wx.EXPAND, 10)
         self.devbox.Add(sizerDevice, 0, wx.ALL | wx.EXPAND, 10)
         self.devbox.Add(sizerButtons, 0, wx.ALL | wx.EXPAND, 10)
@@ -417,6 +434,7 @@ class DialogDevicesGPS(wx.Dialog):
 
     def __on_check(self, _event):
         self.checkGpsRetry.Enable(self.checkGps.GetValue())
+        self.spinRate.Enable(self.checkGps.GetValue())
 
     def __on_click(self, event):
         col = event.GetCol()
@@ -490,6 +508,7 @@ class DialogDevicesGPS(wx.Dialog):
 
         self.settings.gps = self.checkGps.GetValue()
         self.settings.gpsRetry = self.checkGpsRetry.GetValue()
+        self.settings.gpsRate = self.spinRate.GetValue()
         self.settings.devicesGps = self.devices
         if len(self.devices) == 0:
             self.index = -1
@@ -44,11 +44,11 @@ from wx.lib.masked.numctrl import NumCtrl, EVT_NUM
 
 from rtlsdr_scanner.constants import SAMPLE_RATE, TUNER
 from rtlsdr_scanner.events import Event
-from rtlsdr_scanner.file import export_image, File
 from rtlsdr_scanner.misc import format_time
 from rtlsdr_scanner.panels import PanelColourBar
 from rtlsdr_scanner.plot_line import Plotter
-from rtlsdr_scanner.spectrum import Extent, count_points
+from rtlsdr_scanner.render import export_sequence, find_encoder
+from rtlsdr_scanner.spectrum import Extent, count_points, GeoIndex
 from rtlsdr_scanner.utils_mpl import get_colours, create_heatmap
 from rtlsdr_scanner.utils_wx import ValidatorCoord
 from rtlsdr_scanner.widgets import TickCellRenderer
@@ -388,6 +388,14 @@ class DialogExportSeq(wx.Dialog):
         self.editDir = wx.TextCtrl(self)
         self.editDir.SetValue(settings.dirExport)
 
+        self.checkVideo = wx.CheckBox(self, label='Video (fps)')
+        self.checkVideo.SetToolTip('Also encode the sequence to video')
+        self.spinRate = wx.SpinCtrl(self, min=1, max=60, initial=10)
+        if find_encoder() is None:
+            self.checkVideo.Disable()
+            self.spinRate.Disable()
+            self.checkVideo.SetToolTip('Requires ffmpeg')
+
         font = textPlot.GetFont()
         fontSize = font.GetPointSize()
         font.SetPointSize(fontSize + 4)
@@ -434,7 +442,11 @@ class DialogExportSeq(wx.Dialog):
                       flag=wx.ALL | wx.EXPAND, border=5)
         sizerGrid.Add(buttonBrowse, pos=(9, 7),
                       flag=wx.ALL, border=5)
-        sizerGrid.Add(sizerButtons, pos=(10, 7), span=(1, 2),
+        sizerGrid.Add(self.checkVideo, pos=(10, 7),
+                      flag=wx.ALIGN_CENTRE_VERTICAL | wx.ALL, border=5)
+        sizerGrid.Add(self.spinRate, pos=(10, 8),
+                      flag=wx.ALL, border=5)
+        sizerGrid.Add(sizerButtons, pos=(11, 7), span=(1, 2),
                       flag=wx.ALIGN_RIGHT | wx.ALL, border=5)
 
         self.SetSizerAndFit(sizerGrid)
@@ -493,28 +505,27 @@ class DialogExportSeq(wx.Dialog):
     def __on_ok(self, _event):
         self.isExporting = True
         extent = Extent(self.spectrum)
+        directory = self.editDir.GetValue()
+        video = None
+        if self.checkVideo.GetValue():
+            start, end = self.__get_range()
+            video = os.path.join(directory,
+                                 '{0:.0f}-{1:.0f}.mp4'.format(start, end))
         dlgProgress = wx.ProgressDialog('Exporting', '', len(self.sweeps),
                                         style=wx.PD_AUTO_HIDE | wx.PD_CAN_ABORT | wx.PD_REMAINING_TIME)
 
+        def progress(count, name):
+            cont, _skip = dlgProgress.Update(count, os.path.basename(name))
+            return cont
+
         try:
-            count = 1
-            for timeStamp, sweep in self.sweeps.items():
-                name = '{0:.0f}.png'.format(timeStamp)
-                directory = self.editDir.GetValue()
-                # filename = os.path.join(directory, name)
-
-                thread = self.plot.set_plot({timeStamp: sweep}, extent, False)
-                thread.join()
-                filename = os.path.join(directory, '{}.png'.format(timeStamp))
-                export_image(filename, File.ImageType.PNG,
-                             self.figure,
-                             self.settings)
-
-                cont, _skip = dlgProgress.Update(count, name)
-                if not cont:
-                    break
-                count += 1
-        except IOError as error:
+            export_sequence(directory, self.sweeps, extent, self.settings,
+                            self.checkAxes.GetValue(),
+                            self.checkGrid.GetValue(),
+                            self.checkBar.GetValue(),
+                            video, self.spinRate.GetValue(),
+                            progress)
+        except (IOError, OSError) as error:
             wx.MessageBox(error.strerror, 'Error', wx.OK | wx.ICON_WARNING)
         finally:
             dlgProgress.Destroy()
@@ -561,6 +572,7 @@ class DialogExportGeo(wx.Dialog):
         self.filename = ""
         self.spectrum = spectrum
         self.location = location
+        self.index = GeoIndex(spectrum, location)
         self.settings = settings
         self.directory = settings.dirExport
         self.colourMap = settings.colourMap
@@ -573,6 +585,7 @@ class DialogExportGeo(wx.Dialog):
         self.plotCont = True
         self.plotPoint = False
         self.plotHeat = False
+        self.plotPeak = False
         self.plot = None
 
         wx.Dialog.__init__(self, parent=parent, title='Export Map')
@@ -660,12 +673,21 @@ class DialogExportGeo(wx.Dialog):
         sizerBw = wx.BoxSizer(wx.HORIZONTAL)
         sizerBw.Add(textBw, flag=wx.ALL, border=5)
         sizerBw.Add(self.spinBw, flag=wx.ALL, border=5)
+        textLevel = wx.StaticText(self, label='Level')
+        self.choiceLevel = wx.Choice(self, choices=['Mean', 'Peak'])
+        self.choiceLevel.SetToolTip('Level of each location cell')
+        self.choiceLevel.SetSelection(self.plotPeak)
+        self.Bind(wx.EVT_CHOICE, self.__on_level, self.choiceLevel)
+        sizerLevel = wx.BoxSizer(wx.HORIZONTAL)
+        sizerLevel.Add(textLevel, flag=wx.ALL, border=5)
+        sizerLevel.Add(self.choiceLevel, flag=wx.ALL, border=5)
         buttonUpdate = wx.Button(self, label='Update')
         self.Bind(wx.EVT_BUTTON, self.__on_update, buttonUpdate)
         sizerRange = wx.BoxSizer(wx.VERTICAL)
         sizerRange.Add(textRange, flag=wx.ALL, border=5)
         sizerRange.Add(sizerCentre, flag=wx.ALL, border=5)
         sizerRange.Add(sizerBw, flag=wx.ALL, border=5)
+        sizerRange.Add(sizerLevel, flag=wx.ALL, border=5)
         sizerRange.Add(buttonUpdate, flag=wx.ALL, border=5)
 
         textOutput = wx.StaticText(self, label='Output')
@@ -741,37 +763,17 @@ class DialogExportGeo(wx.Dialog):
         freqMin = (freqCentre - freqBw) / 1000.
         freqMax = (freqCentre + freqBw) / 1000.
 
-        coords = {}
-        for timeStamp in self.spectrum:
-            spectrum = self.spectrum[timeStamp]
-            sweep = [yv for xv, yv in spectrum.items() if freqMin <= xv <= freqMax]
-            if len(sweep):
-                peak = max(sweep)
-                try:
-                    location = self.location[timeStamp]
-                except KeyError:
-                    continue
-
-                coord = tuple(location[0:2])
-                if coord not in coords:
-                    coords[coord] = peak
-                else:
-                    coords[coord] = (coords[coord] + peak) / 2
-
-        x = []
-        y = []
-        z = []
-
-        for coord, peak in coords.items():
-            x.append(coord[1])
-            y.append(coord[0])
-            z.append(peak)
-
-        self.extent = (min(x), max(x), min(y), max(y))
-        self.xyz = (x, y, z)
-
-        xi, yi = numpy.meshgrid(numpy.linspace(min(x), max(x), self.IMAGE_SIZE),
-                                numpy.linspace(min(y), max(y), self.IMAGE_SIZE))
+        x, y, z = self.index.get_levels(freqMin, freqMax, self.plotPeak)
+        if len(x) < 3:
+            self.__draw_warning()
+            self.canvas.draw()
+            return
+
+        self.extent = (x.min(), x.max(), y.min(), y.max())
+        self.xyz = (x.tolist(), y.tolist(), z.tolist())
+
+        xi, yi = numpy.meshgrid(numpy.linspace(x.min(), x.max(), self.IMAGE_SIZE),
+                                numpy.linspace(y.min(), y.max(), self.IMAGE_SIZE))
 
         if self.plotMesh or self.plotCont:
             triangle = Triangulation(x, y)
@@ -856,6 +858,10 @@ class DialogExportGeo(wx.Dialog):
         self.plotHeat = self.checkHeat.GetValue()
         self.__on_update(None)
 
+    def __on_level(self, _event):
+        self.plotPeak = self.choiceLevel.GetSelection() == 1
+        self.__on_update(None)
+
     def __on_colour_mesh(self, _event):
         self.colourMesh = self.choiceMapMesh.GetStringSelection()
         self.barMesh.set_map(self.colourMesh)
@@ -35,6 +35,7 @@ from wx.lib.agw.cubecolourdialog import CubeColourDialog
 from wx.lib.masked.numctrl import NumCtrl
 
 from rtlsdr_scanner.constants import F_MIN, F_MAX, SAMPLE_RATE, BANDWIDTH, WINFUNC
+from rtlsdr_scanner.misc import parse_bands
 from rtlsdr_scanner.panels import PanelColourBar
 from rtlsdr_scanner.rtltcp import RtlTcp
 from rtlsdr_scanner.utils_mpl import get_colours
@@ -275,6 +276,34 @@ class DialogPrefs(wx.Dialog):
         self.ctrlWidth = NumCtrl(self, integerWidth=2, fractionWidth=1)
         self.ctrlWidth.SetValue(settings.lineWidth)
 
+        self.checkMesh = wx.CheckBox(self, wx.ID_ANY,
+                                     "Limit 3D polygons")
+        self.checkMesh.SetValue(settings.meshLimit)
+        self.checkMesh.SetToolTip('Decimate the 3D surface to a polygon budget')
+        self.Bind(wx.EVT_CHECKBOX, self.__on_mesh, self.checkMesh)
+        self.spinMesh = wx.SpinCtrl(self, wx.ID_ANY, min=1000, max=500000)
+        self.spinMesh.Enable(settings.meshLimit)
+        self.spinMesh.SetValue(settings.meshMax)
+        self.spinMesh.SetToolTip('Maximum number of 3D polygons')
+        self.checkMeshReuse = wx.CheckBox(self, wx.ID_ANY,
+                                          "Reuse 3D mesh")
+        self.checkMeshReuse.SetValue(settings.meshReuse)
+        self.checkMeshReuse.SetToolTip('Update the existing 3D mesh'
+                                       ' instead of rebuilding it')
+        textFrameRate = wx.StaticText(self, label="Frame rate (fps)")
+        self.spinFrameRate = wx.SpinCtrl(self, wx.ID_ANY, min=1, max=60)
+        self.spinFrameRate.SetValue(settings.frameRate)
+        self.spinFrameRate.SetToolTip('Maximum plot updates per second')
+        textBands = wx.StaticText(self, label="Bands (MHz)")
+        self.editBands = wx.TextCtrl(self, value=settings.bands)
+        self.editBands.SetToolTip('Bands to show on the time line,'
+                                  ' e.g. 145.0-145.2, 433-434')
+        textOccupancy = wx.StaticText(self, label="Occupancy threshold (dB/Hz)")
+        self.spinOccupancy = wx.SpinCtrl(self, wx.ID_ANY, min=-200, max=100)
+        self.spinOccupancy.SetValue(settings.occupancyThres)
+        self.spinOccupancy.SetToolTip('Level above which a bin counts'
+                                      ' as occupied')
+
         self.__on_radio(None)
 
         sizerButtons = wx.StdDialogButtonSizer()
@@ -318,6 +347,15 @@ class DialogPrefs(wx.Dialog):
         plotgrid = wx.GridBagSizer(10, 10)
         plotgrid.Add(textWidth, pos=(0, 0))
         plotgrid.Add(self.ctrlWidth, pos=(0, 1))
+        plotgrid.Add(self.checkMesh, pos=(1, 0))
+        plotgrid.Add(self.spinMesh, pos=(1, 1))
+        plotgrid.Add(self.checkMeshReuse, pos=(2, 0))
+        plotgrid.Add(textFrameRate, pos=(3, 0))
+        plotgrid.Add(self.spinFrameRate, pos=(3, 1))
+        plotgrid.Add(textBands, pos=(4, 0))
+        plotgrid.Add(self.editBands, pos=(4, 1), flag=wx.EXPAND)
+        plotgrid.Add(textOccupancy, pos=(5, 0))
+        plotgrid.Add(self.spinOccupancy, pos=(5, 1))
         plotbox = wx.StaticBoxSizer(wx.StaticBox(self, wx.ID_ANY, "Plot View"),
                                     wx.HORIZONTAL)
         plotbox.Add(plotgrid, 0, wx.ALL | wx.EXPAND, 10)
@@ -341,6 +379,10 @@ class DialogPrefs(wx.Dialog):
         enabled = self.checkPoints.GetValue()
         self.spinPoints.Enable(enabled)
 
+    def __on_mesh(self, _event):
+        enabled = self.checkMesh.GetValue()
+        self.spinMesh.Enable(enabled)
+
     def __on_background(self, _event):
         colour = wx.ColourData()
         colour.SetColour(self.background)
@@ -361,6 +403,15 @@ class DialogPrefs(wx.Dialog):
         self.choiceColour.SetFocus()
 
     def __on_ok(self, _event):
+        try:
+            parse_bands(self.editBands.GetValue())
+        except ValueError:
+            wx.MessageBox('Bands should be ranges in MHz,'
+                          ' e.g. 145.0-145.2, 433-434',
+                          'Error', wx.OK | wx.ICON_WARNING)
+            self.editBands.SetFocus()
+            return
+
         self.settings.saveWarn = self.checkSaved.GetValue()
         self.settings.backup = self.checkBackup.GetValue()
         self.settings.alert = self.checkAlert.GetValue()
@@ -371,6 +422,12 @@ class DialogPrefs(wx.Dialog):
         self.settings.exportDpi = self.spinDpi.GetValue()
         self.settings.retainScans = self.radioRetain.GetValue()
         self.settings.lineWidth = self.ctrlWidth.GetValue()
+        self.settings.meshLimit = self.checkMesh.GetValue()
+        self.settings.meshMax = self.spinMesh.GetValue()
+        self.settings.meshReuse = self.checkMeshReuse.GetValue()
+        self.settings.frameRate = self.spinFrameRate.GetValue()
+        self.settings.bands = self.editBands.GetValue()
+        self.settings.occupancyThres = self.spinOccupancy.GetValue()
         self.settings.retainMax = self.spinCtrlMaxScans.GetValue()
         self.settings.colourMap = self.choiceColour.GetStringSelection()
         self.settings.background = self.background
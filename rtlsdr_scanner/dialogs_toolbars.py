@@ -80,10 +80,34 @@ class DialogPeakThreshold(wx.Dialog):
 
         self.settings = settings
 
+        self.checkAdaptive = wx.CheckBox(self, label='Relative to noise floor')
+        self.checkAdaptive.SetValue(settings.peaksAdaptive)
+        self.checkAdaptive.SetToolTip('Measure the threshold from a running'
+                                      ' estimate of the noise floor')
+        self.Bind(wx.EVT_CHECKBOX, self.__on_adaptive, self.checkAdaptive)
+
         textThres = wx.StaticText(self, label='Threshold (dB)')
         self.ctrlThres = NumCtrl(self, integerWidth=3)
         self.ctrlThres.SetValue(settings.peaksThres)
 
+        textSnr = wx.StaticText(self, label='Above noise floor (dB)')
+        self.ctrlSnr = NumCtrl(self, integerWidth=3)
+        self.ctrlSnr.SetValue(settings.peaksSnr)
+
+        textProm = wx.StaticText(self, label='Prominence (dB)')
+        self.ctrlProm = NumCtrl(self, integerWidth=3)
+        self.ctrlProm.SetValue(settings.peaksProm)
+
+        textSep = wx.StaticText(self, label='Separation (kHz)')
+        self.ctrlSep = NumCtrl(self, integerWidth=5)
+        self.ctrlSep.SetValue(settings.peaksSep)
+
+        textTrack = wx.StaticText(self, label='Tracking tolerance (kHz)')
+        self.ctrlTrack = NumCtrl(self, integerWidth=5)
+        self.ctrlTrack.SetValue(settings.trackTolerance)
+        self.ctrlTrack.SetToolTip('Maximum drift between sweeps for a peak'
+                                  ' to be treated as the same signal')
+
         sizerButtons = wx.StdDialogButtonSizer()
         buttonOk = wx.Button(self, wx.ID_OK)
         buttonCancel = wx.Button(self, wx.ID_CANCEL)
@@ -92,19 +116,49 @@ class DialogPeakThreshold(wx.Dialog):
         sizerButtons.Realize()
 
         sizerGrid = wx.GridBagSizer(5, 5)
-        sizerGrid.Add(textThres, pos=(0, 0),
+        sizerGrid.Add(self.checkAdaptive, pos=(0, 0), span=(1, 2),
+                      flag=wx.ALL, border=5)
+        sizerGrid.Add(textThres, pos=(1, 0),
+                      flag=wx.ALL, border=5)
+        sizerGrid.Add(self.ctrlThres, pos=(1, 1),
+                      flag=wx.ALL | wx.EXPAND, border=5)
+        sizerGrid.Add(textSnr, pos=(2, 0),
                       flag=wx.ALL, border=5)
-        sizerGrid.Add(self.ctrlThres, pos=(0, 1),
+        sizerGrid.Add(self.ctrlSnr, pos=(2, 1),
                       flag=wx.ALL | wx.EXPAND, border=5)
-        sizerGrid.Add(sizerButtons, pos=(1, 1),
+        sizerGrid.Add(textProm, pos=(3, 0),
+                      flag=wx.ALL, border=5)
+        sizerGrid.Add(self.ctrlProm, pos=(3, 1),
+                      flag=wx.ALL | wx.EXPAND, border=5)
+        sizerGrid.Add(textSep, pos=(4, 0),
+                      flag=wx.ALL, border=5)
+        sizerGrid.Add(self.ctrlSep, pos=(4, 1),
+                      flag=wx.ALL | wx.EXPAND, border=5)
+        sizerGrid.Add(textTrack, pos=(5, 0),
+                      flag=wx.ALL, border=5)
+        sizerGrid.Add(self.ctrlTrack, pos=(5, 1),
+                      flag=wx.ALL | wx.EXPAND, border=5)
+        sizerGrid.Add(sizerButtons, pos=(6, 1),
                       flag=wx.ALIGN_RIGHT | wx.ALL, border=5)
 
         self.SetSizerAndFit(sizerGrid)
 
+        self.__on_adaptive(None)
+
         self.Bind(wx.EVT_BUTTON, self.__on_ok, buttonOk)
 
+    def __on_adaptive(self, _event):
+        adaptive = self.checkAdaptive.GetValue()
+        self.ctrlThres.Enable(not adaptive)
+        self.ctrlSnr.Enable(adaptive)
+
     def __on_ok(self, _event):
+        self.settings.peaksAdaptive = self.checkAdaptive.GetValue()
         self.settings.peaksThres = self.ctrlThres.GetValue()
+        self.settings.peaksSnr = self.ctrlSnr.GetValue()
+        self.settings.peaksProm = self.ctrlProm.GetValue()
+        self.settings.peaksSep = self.ctrlSep.GetValue()
+        self.settings.trackTolerance = self.ctrlTrack.GetValue()
 
         self.EndModal(wx.ID_OK)
 
@@ -205,6 +205,7 @@ class DialogSmooth(wx.Dialog):
         self.spectrum = spectrum
         self.settings = settings
         self.smoothed = None
+        self.cache = {}
 
         wx.Dialog.__init__(self, parent=parent, title='Smooth Spectrum',
                            style=wx.RESIZE_BORDER | wx.CAPTION | wx.SYSTEM_MENU |
@@ -224,14 +225,16 @@ class DialogSmooth(wx.Dialog):
         textFunc = wx.StaticText(self, label='Window function')
         self.choiceFunc = wx.Choice(self, choices=WINFUNC[::2])
         self.choiceFunc.SetSelection(WINFUNC[::2].index(settings.smoothFunc))
+        self.Bind(wx.EVT_CHOICE, self.__on_smooth, self.choiceFunc)
 
         textRatio = wx.StaticText(self, label='Smoothing')
         self.slideRatio = wx.Slider(self, value=settings.smoothRatio,
                                     minValue=2, maxValue=100,
                                     style=wx.SL_INVERSE)
+        self.slideRatio.Bind(wx.EVT_SCROLL_CHANGED, self.__on_smooth)
 
-        buttonSmooth = wx.Button(self, label='Smooth')
-        self.Bind(wx.EVT_BUTTON, self.__on_smooth, buttonSmooth)
+        self.checkSmooth = wx.CheckBox(self, label='Smooth')
+        self.Bind(wx.EVT_CHECKBOX, self.__on_smooth, self.checkSmooth)
 
         sizerButtons = wx.StdDialogButtonSizer()
         self.buttonOk = wx.Button(self, wx.ID_OK)
@@ -252,7 +255,7 @@ class DialogSmooth(wx.Dialog):
                       flag=wx.ALL, border=5)
         sizerGrid.Add(self.slideRatio, pos=(4, 6), span=(1, 2),
                       flag=wx.ALL, border=5)
-        sizerGrid.Add(buttonSmooth, pos=(5, 6), span=(1, 2),
+        sizerGrid.Add(self.checkSmooth, pos=(5, 6), span=(1, 2),
                       flag=wx.ALL, border=5)
         sizerGrid.Add(sizerButtons, pos=(11, 6), span=(1, 2),
                       flag=wx.ALIGN_RIGHT | wx.ALL, border=5)
@@ -275,13 +278,20 @@ class DialogSmooth(wx.Dialog):
         self.timer.Start(self.POLL)
 
     def __on_smooth(self, _event):
-        with wx.BusyInfo('Please wait...'):
-            func = self.choiceFunc.GetStringSelection()
-            ratio = self.slideRatio.GetValue()
-            self.smoothed = smooth_spectrum(self.spectrum, func, ratio)
-            self.__draw_plot(self.smoothed)
-            self.buttonOk.Enable()
-            # dlg.Destroy()
+        if not self.checkSmooth.GetValue():
+            self.smoothed = None
+            self.__draw_plot(self.spectrum)
+            self.buttonOk.Disable()
+            return
+
+        key = (self.choiceFunc.GetStringSelection(),
+               self.slideRatio.GetValue())
+        if key not in self.cache:
+            with wx.BusyInfo('Please wait...'):
+                self.cache[key] = smooth_spectrum(self.spectrum, *key)
+        self.smoothed = self.cache[key]
+        self.__draw_plot(self.smoothed)
+        self.buttonOk.Enable()
 
     def __on_ok(self, _event):
         self.EndModal(wx.ID_OK)
@@ -26,10 +26,20 @@
 import time
 from queue import Queue
 
-import wx
+try:
+    import wx
+except ImportError:
+    wx = None
 
 
-EVENT_THREAD = wx.NewId()
+if wx is not None:
+    EVENT_THREAD = wx.NewId()
+    PyEvent = wx.PyEvent
+    Timer = wx.Timer
+else:
+    EVENT_THREAD = None
+    PyEvent = object
+    Timer = object
 
 
 class Event:
@@ -55,14 +65,15 @@ class Status:
         return self.arg2
 
 
-class EventThread(wx.PyEvent):
+class EventThread(PyEvent):
     def __init__(self, status, arg1=None, arg2=None):
-        wx.PyEvent.__init__(self)
-        self.SetEventType(EVENT_THREAD)
+        if wx is not None:
+            wx.PyEvent.__init__(self)
+            self.SetEventType(EVENT_THREAD)
         self.data = Status(status, arg1, arg2)
 
 
-class EventTimer(wx.Timer):
+class EventTimer(Timer):
     def __init__(self, parent, delay,
                  eventCount=Event.DELAY_COUNT, eventStart=Event.DELAY_START):
         wx.Timer.__init__(self)
@@ -86,6 +97,66 @@ class EventTimer(wx.Timer):
                        EventThread(self.eventStart))
 
 
+class FrameScheduler(Timer):
+    def __init__(self, frameRate, isBusy, onPlot, onDraw):
+        wx.Timer.__init__(self)
+        self.isBusy = isBusy
+        self.onPlot = onPlot
+        self.onDraw = onDraw
+        self.interval = None
+        self.doPlot = False
+        self.doDraw = False
+        self.rendered = 0
+        self.dropped = 0
+
+        self.set_rate(frameRate)
+
+    def __start(self):
+        if not self.IsRunning():
+            self.Start(self.interval)
+
+    def Notify(self):
+        if self.isBusy():
+            return
+
+        if self.doPlot:
+            self.doPlot = False
+            if self.doDraw:
+                self.doDraw = False
+                self.dropped += 1
+            self.onPlot()
+        elif self.doDraw:
+            self.doDraw = False
+            self.rendered += 1
+            self.onDraw()
+        else:
+            self.Stop()
+
+    def set_rate(self, frameRate):
+        self.interval = int(1000 / max(frameRate, 1))
+        if self.IsRunning():
+            self.Start(self.interval)
+
+    def schedule_plot(self):
+        if self.doPlot:
+            self.dropped += 1
+        self.doPlot = True
+        self.__start()
+
+    def schedule_draw(self):
+        if self.doDraw:
+            self.dropped += 1
+        self.doDraw = True
+        self.__start()
+
+    def get_stats(self):
+        return self.rendered, self.dropped
+
+    def clear_stats(self):
+        self.rendered = 0
+        self.dropped = 0
+
+
 class Log:
     MAX_ENTRIES = 24
 
@@ -119,7 +190,7 @@ class Log:
 def post_event(destination, status):
     if isinstance(destination, Queue):
         destination.put(status)
-    elif isinstance(destination, wx.EvtHandler):
+    elif wx is not None and isinstance(destination, wx.EvtHandler):
         wx.PostEvent(destination, status)
 
 
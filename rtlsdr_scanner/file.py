@@ -34,12 +34,16 @@ import tempfile
 import threading
 import uuid
 import zipfile
-from pickle import dump, load, UnpicklingError, PickleError
+from pickle import dump, dumps, load, loads, UnpicklingError, PickleError, \
+    HIGHEST_PROTOCOL
 
 from PIL import Image
 import matplotlib
 from matplotlib.backends.backend_agg import FigureCanvasAgg
-import wx
+try:
+    import wx
+except ImportError:
+    wx = None
 
 from rtlsdr_scanner.constants import APP_NAME
 from rtlsdr_scanner.misc import format_iso_time
@@ -52,7 +56,7 @@ def bs(s):
 
 class File:
     class Types:
-        SAVE, PLOT, IMAGE, GEO, GMAP, TRACK, CONT = range(7)
+        SAVE, PLOT, IMAGE, GEO, GMAP, TRACK, CONT, SIGNALS = range(8)
 
     class SaveType:
         RFS = 0
@@ -72,6 +76,9 @@ class File:
     class TrackType:
         GPX = 0
 
+    class SignalType:
+        CSV = 0
+
     SAVE = [''] * 1
     SAVE[SaveType.RFS] = 'RTLSDR frequency scan (*.rfs)|*.rfs'
 
@@ -112,13 +119,17 @@ class File:
     CONT = [''] * 1
     CONT[PlotType.CSV] = PLOT[PlotType.CSV]
 
+    SIGNALS = [''] * 1
+    SIGNALS[SignalType.CSV] = PLOT[PlotType.CSV]
+
     HEADER = APP_NAME
     VERSION = 9
 
     @staticmethod
     def __get_types(f_type):
         return [File.SAVE, File.PLOT, File.IMAGE,
-                File.GEO, File.GMAP, File.TRACK, File.CONT][f_type]
+                File.GEO, File.GMAP, File.TRACK, File.CONT,
+                File.SIGNALS][f_type]
 
     @staticmethod
     def get_type_ext(index, f_type=Types.PLOT):
@@ -367,8 +378,11 @@ def open_plot(dirname, filename):
     handle.close()
 
     if error or header != File.HEADER:
-        wx.MessageBox('Invalid or corrupted file', 'Warning',
-                      wx.OK | wx.ICON_WARNING)
+        if wx is not None:
+            wx.MessageBox('Invalid or corrupted file', 'Warning',
+                          wx.OK | wx.ICON_WARNING)
+        else:
+            print('Invalid or corrupted file: {}'.format(path))
         return None, None, None
 
     scanInfo = ScanInfo()
@@ -435,11 +449,33 @@ def export_cont(handle, filename, spectrum):
     return handle
 
 
-def export_image(filename, i_format, figure, settings):
-    oldSize = figure.get_size_inches()
-    oldDpi = figure.get_dpi()
-    figure.set_size_inches((settings.exportWidth, settings.exportHeight))
-    figure.set_dpi(settings.exportDpi)
+class RenderCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.key = None
+        self.image = None
+
+    def get(self, key):
+        with self.lock:
+            if key is not None and key == self.key:
+                return self.image
+        return None
+
+    def set(self, key, image):
+        with self.lock:
+            self.key = key
+            self.image = image
+
+    def clear(self):
+        self.set(None, None)
+
+
+renderCache = RenderCache()
+
+
+def __draw_figure(figure, sizeInches, dpi):
+    figure.set_size_inches(sizeInches)
+    figure.set_dpi(dpi)
 
     canvas = FigureCanvasAgg(figure)
     canvas.draw()
@@ -449,15 +485,54 @@ def export_image(filename, i_format, figure, settings):
     else:
         buf = renderer.buffer_rgba(0, 0)
     size = canvas.get_width_height()
-    image = Image.frombuffer('RGBA', size, buf, 'raw', 'RGBA', 0, 1)
-    image = image.convert('RGB')
+
+    return Image.frombuffer('RGBA', size, buf, 'raw', 'RGBA', 0, 1)
+
+
+def render_figure(figure, sizeInches, dpi, clone=True, revision=None):
+    key = None
+    if revision is not None:
+        key = (revision, tuple(sizeInches), dpi)
+        image = renderCache.get(key)
+        if image is not None:
+            return image
+
+    state = None
+    if clone:
+        try:
+            state = dumps(figure, HIGHEST_PROTOCOL)
+        except (PickleError, TypeError, AttributeError):
+            pass
+
+    if state is None:
+        oldSize = figure.get_size_inches()
+        oldDpi = figure.get_dpi()
+        oldCanvas = figure.canvas
+        image = __draw_figure(figure, sizeInches, dpi)
+        figure.set_size_inches(oldSize)
+        figure.set_dpi(oldDpi)
+        figure.set_canvas(oldCanvas)
+    else:
+        image = __draw_figure(loads(state), sizeInches, dpi)
+
+    if key is not None:
+        renderCache.set(key, image)
+
+    return image
+
+
+def export_image(filename, i_format, figure, settings, clone=True,
+                 revision=None):
+    image = render_figure(figure,
+                          (settings.exportWidth, settings.exportHeight),
+                          settings.exportDpi,
+                          clone, revision)
+    if i_format not in [File.ImageType.PNG, File.ImageType.TIFF]:
+        image = image.convert('RGB')
     ext = File.get_type_ext(i_format, File.Types.IMAGE)
     image.save(filename, format=ext[1::], dpi=(settings.exportDpi,
                                                settings.exportDpi))
 
-    figure.set_size_inches(oldSize)
-    figure.set_dpi(oldDpi)
-
 
 def export_map(filename, exportType, bounds, image, xyz):
     if exportType == File.GeoType.KMZ:
@@ -646,6 +721,20 @@ def export_gpx(filename, locations, name):
     handle.close()
 
 
+def export_signals(filename, signals, duty):
+    handle = open(filename, 'wb')
+    handle.write(bs("Frequency (MHz),Level (dB/Hz),Max level (dB/Hz),"
+                    "Bandwidth (kHz),Duty cycle (%),"
+                    "First seen (UTC),Last seen (UTC)\n"))
+    for signal, cycle in zip(signals, duty):
+        handle.write(bs("{}, {}, {}, {}, {}, {}, {}\n".format(
+            signal['freq'], signal['level'], signal['maxLevel'],
+            signal['bandwidth'] * 1000, cycle,
+            format_iso_time(signal['first']),
+            format_iso_time(signal['last']))))
+    handle.close()
+
+
 def write_numpy(handle, array, name):
     handle.write(bs('{}=[\n'.format(name)))
     for i in array:
@@ -22,41 +22,64 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
+import base64
+from bisect import bisect_left, bisect_right
+from functools import reduce
+import gzip
 import json
 import mimetypes
 import os
-import select
+import queue
+import selectors
 import socket
+import struct
 import threading
 import time
+import zlib
+from operator import xor
 from http.server import BaseHTTPRequestHandler, HTTPServer
-from urllib.parse import urlparse
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs
 from urllib.request import pathname2url
 
+import numpy
 import serial
 from serial.serialutil import SerialException
 
 from rtlsdr_scanner.constants import LOCATION_PORT, APP_NAME
 from rtlsdr_scanner.devices import DeviceGPS
 from rtlsdr_scanner.events import post_event, EventThread, Event, Log
+from rtlsdr_scanner.spectrum import BandPower, slice_levels, decimate_levels
 from rtlsdr_scanner.misc import format_iso_time, haversine, format_time, \
     limit_to_ascii, limit, get_resource
 
 TIMEOUT = 15
+SERIAL_TIMEOUT = 0.5
+LINE_MAX = 4096
+RECV_SIZE = 16384
 
 
 class ThreadLocation(threading.Thread):
-    def __init__(self, notify, device, raw=False):
+    def __init__(self, notify, device, raw=False, rate=0):
         threading.Thread.__init__(self)
         self.name = 'Location'
         self._notify = notify
         self._device = device
         self._raw = raw
+        self._rate = rate
         self._cancel = False
         self._comm = None
         self._timeout = None
         self._sats = {}
+        self._used = {}
+        self._alt = None
+        self._nextPost = None
+        self._epoch = None
         self._send = None
+        self._parsers = {b'GGA': self.__nmea_global_fix,
+                         b'RMC': self.__nmea_min_fix,
+                         b'GSA': self.__nmea_active,
+                         b'GSV': self.__nmea_sats}
 
         self.start()
 
@@ -86,40 +109,64 @@ class ThreadLocation(threading.Thread):
         return True
 
     def __tcp_read(self, isGpsd=False):
-        buf = ''
-        data = True
-
-        while data and not self._cancel:
-            reads, writes, errors = select.select([self._comm],
-                                                  [self._comm],
-                                                  [self._comm],
-                                                  0.1)
-            for read in reads:
-                data = read.recv(64)
-                buf += data
-                while buf.find('\n') != -1:
-                    line, buf = buf.split('\n', 1)
-                    if not isGpsd:
-                        pos = line.find('$')
-                        if pos != -1 and pos + 1 < len(line):
-                            yield line[pos + 1:].rstrip('\r\n')
-                    else:
-                        yield line
-                    if self._raw:
-                        line = limit_to_ascii(line)
-                        post_event(self._notify, EventThread(Event.LOC_RAW,
-                                                             0, line))
+        buf = bytearray()
+        selector = selectors.DefaultSelector()
+        events = selectors.EVENT_READ
+        selector.register(self._comm, events)
 
-            for write in writes:
+        try:
+            while not self._cancel:
+                wanted = selectors.EVENT_READ
                 if self._send is not None:
-                    write.sendall(self._send)
-                    self._send = None
-
-            for _error in errors:
-                post_event(self._notify, EventThread(Event.LOC_ERR,
-                                                     0,
-                                                     'Connection dropped:' + str(_error)))
-        return
+                    wanted |= selectors.EVENT_WRITE
+                if wanted != events:
+                    events = wanted
+                    selector.modify(self._comm, events)
+
+                for _key, mask in selector.select(0.5):
+                    if mask & selectors.EVENT_WRITE:
+                        self._comm.sendall(self._send.encode('ascii'))
+                        self._send = None
+
+                    if mask & selectors.EVENT_READ:
+                        data = self._comm.recv(RECV_SIZE)
+                        if not data:
+                            post_event(self._notify,
+                                       EventThread(Event.LOC_ERR, 0,
+                                                   'Connection dropped'))
+                            return
+                        buf += data
+                        end = buf.rfind(b'\n')
+                        if end == -1:
+                            if len(buf) > LINE_MAX:
+                                del buf[:]
+                            continue
+
+                        lines = bytes(buf[:end]).split(b'\n')
+                        del buf[:end + 1]
+                        if isGpsd:
+                            lines = [line.decode('ascii', 'replace')
+                                     for line in lines]
+                        else:
+                            lines = [line[line.find(b'$') + 1:].rstrip(b'\r')
+                                     for line in lines
+                                     if -1 < line.find(b'$') < len(line) - 1]
+                        if lines:
+                            yield lines
+                            if self._raw:
+                                for line in lines:
+                                    if not isGpsd:
+                                        line = line.decode('ascii', 'replace')
+                                    line = limit_to_ascii(line)
+                                    post_event(self._notify,
+                                               EventThread(Event.LOC_RAW,
+                                                           0, line))
+        except socket.error as error:
+            post_event(self._notify, EventThread(Event.LOC_ERR,
+                                                 0,
+                                                 'Connection dropped:' + str(error)))
+        finally:
+            selector.close()
 
     def __serial_timeout(self):
         self.stop()
@@ -138,7 +185,7 @@ class ThreadLocation(threading.Thread):
                                        parity=self._device.parity,
                                        stopbits=self._device.stops,
                                        xonxoff=self._device.soft,
-                                       timeout=0)
+                                       timeout=SERIAL_TIMEOUT)
 
         except SerialException as error:
             post_event(self._notify, EventThread(Event.LOC_ERR,
@@ -156,28 +203,36 @@ class ThreadLocation(threading.Thread):
         return True
 
     def __serial_read(self):
-        isSentence = False
-        sentence = ''
+        buf = bytearray()
         while not self._cancel:
-            data = self._comm.read(1)
-            if data:
-                self._timeout.reset()
-                if data == '$':
-                    isSentence = True
-                    continue
-                if data == '\r' or data == '\n':
-                    isSentence = False
-                    if sentence:
-                        yield sentence
-                        if self._raw:
-                            line = limit_to_ascii(sentence)
-                            post_event(self._notify, EventThread(Event.LOC_RAW,
-                                                                 0, line))
-                        sentence = ''
-                if isSentence:
-                    sentence += data
-            else:
-                time.sleep(0.1)
+            data = self._comm.read(self._comm.in_waiting or 1)
+            if not data:
+                continue
+
+            self._timeout.reset()
+            buf += data
+            end = max(buf.rfind(b'\n'), buf.rfind(b'\r'))
+            if end == -1:
+                if len(buf) > LINE_MAX:
+                    del buf[:]
+                continue
+
+            lines = bytes(buf[:end]).replace(b'\r', b'\n').split(b'\n')
+            del buf[:end + 1]
+
+            sentences = []
+            for line in lines:
+                pos = line.find(b'$')
+                if pos != -1 and pos + 1 < len(line):
+                    sentences.append(line[pos + 1:])
+            if sentences:
+                yield sentences
+                if self._raw:
+                    for sentence in sentences:
+                        line = limit_to_ascii(sentence.decode('ascii',
+                                                              'replace'))
+                        post_event(self._notify, EventThread(Event.LOC_RAW,
+                                                             0, line))
 
     def __gpsd_open(self):
         if not self.__tcp_connect(2947):
@@ -198,38 +253,41 @@ class ThreadLocation(threading.Thread):
         return True
 
     def __gpsd_read(self):
-        for resp in self.__tcp_read(True):
-            data = json.loads(resp)
-            if data['class'] == 'TPV':
-                if data['mode'] in [2, 3]:
+        for lines in self.__tcp_read(True):
+            for resp in lines:
+                data = json.loads(resp)
+                if data['class'] == 'TPV':
+                    if data['mode'] in [2, 3]:
+                        try:
+                            lat = data['lat']
+                            lon = data['lon']
+                        except KeyError:
+                            return
+                        try:
+                            alt = data['alt']
+                        except KeyError:
+                            alt = None
+                        self.__post_location(lat, lon, alt,
+                                             data.get('time'))
+                elif data['class'] == 'SKY':
+                    self.__gpsd_sats(data['satellites'])
+
+    def __gpsd_old_read(self):
+        for lines in self.__tcp_read(True):
+            for resp in lines:
+                data = resp.split(' ')
+                if len(data) == 15 and data[0] == 'GPSD,O=GGA':
                     try:
-                        lat = data['lat']
-                        lon = data['lon']
-                    except KeyError:
+                        lat = float(data[4])
+                        lon = float(data[3])
+                    except ValueError:
                         return
                     try:
-                        alt = data['alt']
-                    except KeyError:
+                        alt = float(data[5])
+                    except ValueError:
                         alt = None
-                    self.__post_location(lat, lon, alt)
-            elif data['class'] == 'SKY':
-                self.__gpsd_sats(data['satellites'])
 
-    def __gpsd_old_read(self):
-        for resp in self.__tcp_read(True):
-            data = resp.split(' ')
-            if len(data) == 15 and data[0] == 'GPSD,O=GGA':
-                try:
-                    lat = float(data[4])
-                    lon = float(data[3])
-                except ValueError:
-                    return
-                try:
-                    alt = float(data[5])
-                except ValueError:
-                    alt = None
-
-                self.__post_location(lat, lon, alt)
+                    self.__post_location(lat, lon, alt)
 
     def __gpsd_close(self):
         if self._device.type == DeviceGPS.GPSD:
@@ -259,63 +317,93 @@ class ThreadLocation(threading.Thread):
         else:
             comm = self.__tcp_read()
 
-        for resp in comm:
-            nmea = resp.split('*')
-            if len(nmea) == 2:
-                data = nmea[0].split(',')
-                if data[0] in ['GPGGA', 'GPGSV']:
-                    checksum = self.__nmea_checksum(nmea[0])
-                    if checksum == nmea[1]:
-                        if data[0] == 'GPGGA':
-                            self.__nmea_global_fix(data)
-                        elif data[0] == 'GPGSV':
-                            self.__nmea_sats(data)
-                    else:
-                        error = 'Invalid checksum {}, should be {}'.format(resp[1],
-                                                                           checksum)
-                        post_event(self._notify, EventThread(Event.LOC_WARN,
-                                                             0, error))
-
-    def __nmea_checksum(self, data):
-        checksum = 0
-        for char in data:
-            checksum ^= ord(char)
-        return "{0:02X}".format(checksum)
-
-    def __nmea_global_fix(self, data):
-        if data[6] in ['1', '2']:
+        for sentences in comm:
+            self.__nmea_parse(sentences)
+
+    def __nmea_parse(self, sentences):
+        for sentence in sentences:
+            body, _sep, check = sentence.partition(b'*')
+            if body[:1] == b'P' or body[5:6] != b',':
+                continue
+            parser = self._parsers.get(body[2:5])
+            if parser is None:
+                continue
+
+            checksum = reduce(xor, body, 0)
+            try:
+                valid = int(check[:2], 16) == checksum
+            except ValueError:
+                valid = False
+            if not valid:
+                error = 'Invalid checksum {}, should be {:02X}'.format(
+                    check[:2].decode('ascii', 'replace'), checksum)
+                post_event(self._notify, EventThread(Event.LOC_WARN,
+                                                     0, error))
+                continue
+
+            data = body.decode('ascii', 'replace').split(',')
+            try:
+                parser(data[0][:2], data)
+            except (IndexError, ValueError):
+                pass
+
+    def __nmea_global_fix(self, _talker, data):
+        if data[6] not in ['', '0']:
             lat = self.__nmea_coord(data[2], data[3])
             lon = self.__nmea_coord(data[4], data[5])
             try:
                 alt = float(data[9])
             except ValueError:
                 alt = None
+            self._alt = alt
+
+            self.__post_location(lat, lon, alt, data[1])
+
+    def __nmea_min_fix(self, _talker, data):
+        if data[2] == 'A':
+            lat = self.__nmea_coord(data[3], data[4])
+            lon = self.__nmea_coord(data[5], data[6])
 
-            self.__post_location(lat, lon, alt)
+            self.__post_location(lat, lon, self._alt, data[1])
 
-    def __nmea_sats(self, data):
-        message = int(data[1])
+    def __nmea_active(self, talker, data):
+        if data[2] in ['2', '3']:
+            self._used[talker] = set(int(sat) for sat in data[3:15] if sat)
+        else:
+            self._used.pop(talker, None)
+
+    def __nmea_sats(self, talker, data):
         messages = int(data[1])
+        message = int(data[2])
         viewed = int(data[3])
 
         if message == 1:
-            self._sats.clear()
+            self._sats[talker] = {}
+        sats = self._sats.setdefault(talker, {})
+        used = set()
+        for active in self._used.values():
+            used |= active
 
         blocks = int((len(data) - 4) / 4)
         for i in range(0, blocks):
             sat = int(data[4 + i * 4])
             level = data[7 + i * 4]
-            used = True
             if level == '':
                 level = None
-                used = False
             else:
                 level = int(level)
-            self._sats[sat] = [level, used]
+            if len(self._used):
+                isUsed = sat in used
+            else:
+                isUsed = level is not None
+            sats[sat] = [level, isUsed]
 
-        if message == messages and len(self._sats) == viewed:
+        if message == messages and len(sats) == viewed:
+            allSats = {}
+            for talkerSats in self._sats.values():
+                allSats.update(talkerSats)
             post_event(self._notify,
-                       EventThread(Event.LOC_SAT, None, self._sats))
+                       EventThread(Event.LOC_SAT, None, allSats))
 
     def __nmea_coord(self, coord, orient):
         pos = None
@@ -348,8 +436,20 @@ class ThreadLocation(threading.Thread):
         if self._comm is not None:
             self._comm.close()
 
-    def __post_location(self, lat, lon, alt):
+    def __post_location(self, lat, lon, alt, epoch=None):
+        if epoch:
+            if epoch == self._epoch:
+                return
+            self._epoch = epoch
+
         utc = time.time()
+        if self._rate:
+            period = 1. / self._rate
+            if self._nextPost is None:
+                self._nextPost = utc - period / 2
+            if utc < self._nextPost:
+                return
+            self._nextPost = max(self._nextPost + period, utc - period / 2)
         post_event(self._notify,
                    EventThread(Event.LOC, 0, [lat, lon, alt, utc]))
 
@@ -386,14 +486,338 @@ class ThreadLocation(threading.Thread):
             self._notify.queue.clear()
 
 
+class LocationTrack:
+    def __init__(self, size=1024):
+        self.lock = threading.Lock()
+        self.times = numpy.empty(size)
+        self.points = numpy.empty((size, 3))
+        self.count = 0
+
+    def add(self, lat, lon, alt, timeStamp):
+        if lat is None or lon is None:
+            return
+        if alt is None:
+            alt = numpy.nan
+
+        with self.lock:
+            if self.count == len(self.times):
+                self.times = numpy.resize(self.times, self.count * 2)
+                self.points = numpy.resize(self.points, (self.count * 2, 3))
+            pos = self.count
+            if pos and timeStamp < self.times[pos - 1]:
+                pos = numpy.searchsorted(self.times[:self.count], timeStamp)
+                self.times[pos + 1:self.count + 1] = self.times[pos:self.count]
+                self.points[pos + 1:self.count + 1] = self.points[pos:self.count]
+            self.times[pos] = timeStamp
+            self.points[pos] = (lat, lon, alt)
+            self.count += 1
+
+    def get(self, timeStamp, gap=TIMEOUT):
+        with self.lock:
+            if not self.count:
+                return None
+            times = self.times[:self.count]
+            pos = numpy.searchsorted(times, timeStamp)
+            if pos == 0:
+                if times[0] - timeStamp > gap:
+                    return None
+                point = self.points[0]
+            elif pos == self.count:
+                if timeStamp - times[-1] > gap:
+                    return None
+                point = self.points[self.count - 1]
+            else:
+                start = times[pos - 1]
+                end = times[pos]
+                if end - start > gap * 2:
+                    return None
+                ratio = (timeStamp - start) / (end - start)
+                before = self.points[pos - 1]
+                after = self.points[pos]
+                point = before + (after - before) * ratio
+                if numpy.isnan(point[2]):
+                    point[2] = before[2] if ratio < 0.5 else after[2]
+
+        lat, lon, alt = point.tolist()
+        if numpy.isnan(alt):
+            alt = None
+
+        return lat, lon, alt
+
+    def trim(self, timeStamp):
+        with self.lock:
+            pos = numpy.searchsorted(self.times[:self.count], timeStamp)
+            pos = max(pos - 1, 0)
+            self.times[:self.count - pos] = self.times[pos:self.count]
+            self.points[:self.count - pos] = self.points[pos:self.count]
+            self.count -= pos
+
+    def clear(self):
+        with self.lock:
+            self.count = 0
+
+    def geotag(self, spectrum, locations, captured=None):
+        if not self.count or not len(spectrum):
+            return
+
+        latest = next(reversed(spectrum))
+        tagged = []
+        for timeStamp in reversed(spectrum):
+            if timeStamp in locations or timeStamp < self.times[0] - TIMEOUT:
+                break
+            if timeStamp == latest and captured is not None:
+                location = self.get(captured)
+            else:
+                location = self.get(timeStamp)
+            if location is not None:
+                tagged.append((timeStamp, location))
+
+        for timeStamp, location in reversed(tagged):
+            locations[timeStamp] = location
+
+
+class LocationCache:
+    def __init__(self, locations, lock):
+        self.locations = locations
+        self.lock = lock
+        self.cacheLock = threading.Lock()
+        self.times = []
+        self.points = []
+        self.coords = []
+        self.version = 0
+        self.kml = None
+        self.geojson = None
+
+    def __append(self, timeStamp, location):
+        lat, lon, alt = location
+        if alt is None:
+            coord = '\t\t\t\t<gx:coord>{} {}</gx:coord>\n'.format(lon, lat)
+        else:
+            coord = '\t\t\t\t<gx:coord>{} {} {}</gx:coord>\n'.format(lon, lat,
+                                                                   alt)
+        coord += '\t\t\t\t<when>{}</when>\n'.format(format_iso_time(timeStamp))
+
+        self.times.append(timeStamp)
+        self.points.append(location)
+        self.coords.append(coord)
+
+    def __changed(self):
+        self.version += 1
+        self.kml = None
+        self.geojson = None
+
+    def update(self):
+        with self.cacheLock:
+            with self.lock:
+                count = len(self.locations)
+                first = next(iter(self.locations)) if count else None
+                last = self.times[-1] if len(self.times) else None
+                new = []
+                stale = last is not None and last not in self.locations
+                if not stale:
+                    for timeStamp in reversed(self.locations):
+                        if last is not None and timeStamp <= last:
+                            break
+                        new.append((timeStamp, self.locations[timeStamp]))
+
+            if first is None:
+                drop = len(self.times)
+            else:
+                drop = bisect_left(self.times, first)
+            if drop:
+                del self.times[:drop]
+                del self.points[:drop]
+                del self.coords[:drop]
+                self.__changed()
+
+            if new:
+                for timeStamp, location in reversed(new):
+                    self.__append(timeStamp, location)
+                self.__changed()
+
+            if stale or len(self.times) != count:
+                with self.lock:
+                    locations = sorted(self.locations.items())
+                self.times = []
+                self.points = []
+                self.coords = []
+                for timeStamp, location in locations:
+                    self.__append(timeStamp, location)
+                self.__changed()
+
+            return self.version
+
+    def get_kml_track(self):
+        with self.cacheLock:
+            if not len(self.times):
+                return '', ''
+
+            lat = [y for y, _x, _z in self.points]
+            lon = [x for _y, x, _z in self.points]
+            latMin = min(lat)
+            latMax = max(lat)
+            lonMin = min(lon)
+            lonMax = max(lon)
+            latCen = (latMax + latMin) / 2
+            lonCen = (lonMax + lonMin) / 2
+            dist = haversine(latMin, latMax, lonMin, lonMax)
+            dist = limit(dist, 100, 50000)
+
+            lookAt = ('\t\t<LookAt>\n'
+                      '\t\t\t<latitude>{}</latitude>\n'
+                      '\t\t\t<longitude>{}</longitude>\n'
+                      '\t\t\t<altitudeMode>clampToGround</altitudeMode>\n'
+                      '\t\t\t<range>{}</range>\n'
+                      '\t\t\t<gx:TimeSpan>\n'
+                      '\t\t\t\t<begin>{}</begin>\n'
+                      '\t\t\t\t<end>{}</end>\n'
+                      '\t\t\t</gx:TimeSpan>\n'
+                      '\t\t</LookAt>\n'). \
+                format(latCen, lonCen, dist * 2,
+                       format_iso_time(self.times[0]),
+                       format_iso_time(self.times[-1]))
+
+            track = ('\t\t<Placemark>\n'
+                     '\t\t\t<name>Track</name>\n'
+                     '\t\t\t<description>{} locations</description>\n'
+                     '\t\t\t<styleUrl>#track</styleUrl>\n'
+                     '\t\t\t<gx:Track>\n'
+                     '\t\t\t\t<altitudeMode>clampToGround</altitudeMode>\n'). \
+                format(len(self.times))
+            track += ''.join(self.coords)
+            track += ('\t\t\t</gx:Track>\n'
+                      '\t\t</Placemark>\n')
+
+            return lookAt, track
+
+    def get_features(self, since=None):
+        with self.cacheLock:
+            start = 0
+            if since is not None:
+                start = bisect_right(self.times, since)
+
+            return [{'type': 'Feature',
+                     'geometry': {'type': 'Point',
+                                  'coordinates': location},
+                     'properties': {'time': timeStamp}}
+                    for timeStamp, location in zip(self.times[start:],
+                                                   self.points[start:])]
+
+    def get_cached(self, name):
+        with self.cacheLock:
+            return getattr(self, name)
+
+    def set_cached(self, name, version, data):
+        with self.cacheLock:
+            if version == self.version:
+                setattr(self, name, data)
+
+
+class SweepStream:
+    QUEUE_SIZE = 8
+    SCALE = 100.
+    INVALID = -32768
+    KEY, DELTA = range(2)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = []
+        self.seq = 0
+        self.freqs = None
+        self.levels = None
+        self.dropped = 0
+
+    def __quantise(self, levels):
+        valid = numpy.isfinite(levels)
+        quant = numpy.full(len(levels), self.INVALID, dtype=numpy.int16)
+        quant[valid] = numpy.clip(numpy.round(levels[valid] * self.SCALE),
+                                  self.INVALID + 1, 32767)
+
+        return quant
+
+    def __encode(self, frameType, timeStamp, count, payload):
+        header = struct.pack('<4sBIdI', b'RFSF', frameType, self.seq,
+                             timeStamp, count)
+        frame = zlib.compress(header + payload)
+        frame = base64.b64encode(frame).decode('ascii')
+
+        return ('event: {}\n'
+                'id: {}\n'
+                'data: {}\n\n').format(('key', 'delta')[frameType],
+                                        self.seq, frame).encode('ascii')
+
+    def subscribe(self):
+        client = queue.Queue(self.QUEUE_SIZE)
+        client.needKey = True
+        with self.lock:
+            self.clients.append(client)
+
+        return client
+
+    def unsubscribe(self, client):
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def publish(self, timeStamp, freqs, levels):
+        with self.lock:
+            if not len(self.clients):
+                self.freqs = None
+                return
+
+            self.seq += 1
+            quant = self.__quantise(levels)
+            key = self.__encode(self.KEY, timeStamp, len(freqs),
+                                freqs.astype('<f8').tobytes() +
+                                quant.astype('<i2').tobytes())
+            delta = None
+            if self.freqs is not None and \
+                    numpy.array_equal(self.freqs, freqs):
+                diff = quant.astype(numpy.int32) - self.levels
+                diff = diff.astype(numpy.int16)
+                delta = self.__encode(self.DELTA, timeStamp, len(freqs),
+                                      diff.astype('<i2').tobytes())
+            self.freqs = freqs
+            self.levels = quant.astype(numpy.int32)
+
+            for client in self.clients:
+                frame = delta
+                if client.needKey or frame is None:
+                    frame = key
+                try:
+                    client.put_nowait(frame)
+                    client.needKey = False
+                except queue.Full:
+                    client.needKey = True
+                    self.dropped += 1
+
+    def close(self):
+        with self.lock:
+            for client in self.clients:
+                try:
+                    client.put_nowait(None)
+                except queue.Full:
+                    client.get_nowait()
+                    client.put_nowait(None)
+            self.clients = []
+
+
+class LocationHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
 class LocationServer:
-    def __init__(self, locations, currentLoc, lock, log):
-        self.server = HTTPServer(('127.0.0.1', LOCATION_PORT),
-                                 LocationServerHandler)
+    def __init__(self, locations, currentLoc, lock, log, store=None,
+                 stream=None):
+        self.server = LocationHTTPServer(('127.0.0.1', LOCATION_PORT),
+                                         LocationServerHandler)
         self.server.locations = locations
         self.server.currentLoc = currentLoc
         self.server.lock = lock
         self.server.log = log
+        self.server.cache = LocationCache(locations, lock)
+        self.server.store = store
+        self.server.stream = stream
         self.thread = threading.Thread(target=self.__serve, name='Location')
         self.thread.start()
 
@@ -401,41 +825,54 @@ class LocationServer:
         self.server.serve_forever()
 
     def close(self):
+        if self.server.stream is not None:
+            self.server.stream.close()
         self.server.shutdown()
+        self.server.server_close()
 
 
 class LocationServerHandler(BaseHTTPRequestHandler):
-    def __create_lookat(self):
-        if not len(self.server.locations):
-            return ''
+    GZIP_MIN = 1024
+    KEEPALIVE = 15
+    BAND_MODES = {'peak': BandPower.PEAK,
+                  'mean': BandPower.MEAN,
+                  'integrated': BandPower.INTEGRATED}
+
+    def __get_etag(self, version):
+        return '"{}-{}"'.format(version, self.server.currentLoc[3])
+
+    def __is_gzip(self, data):
+        return len(data) >= self.GZIP_MIN and \
+            'gzip' in self.headers.get('Accept-Encoding', '')
+
+    def __not_modified(self, etag):
+        tags = self.headers.get('If-None-Match', '')
+        tags = [tag.strip() for tag in tags.split(',')]
+        if etag in tags or '{}-gz"'.format(etag[:-1]) in tags:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return True
+
+        return False
+
+    def __send_data(self, data, contentType, etag):
+        encoded = self.__is_gzip(data)
+        if encoded:
+            data = gzip.compress(data, 6)
+            etag = '{}-gz"'.format(etag[:-1])
 
-        begin = format_iso_time(min(self.server.locations))
-        end = format_iso_time(max(self.server.locations))
-
-        lat = [y for y, _x, _z in self.server.locations.values()]
-        lon = [x for _y, x, _z in self.server.locations.values()]
-        latMin = min(lat)
-        latMax = max(lat)
-        lonMin = min(lon)
-        lonMax = max(lon)
-        latCen = (latMax + latMin) / 2
-        lonCen = (lonMax + lonMin) / 2
-        dist = haversine(latMin, latMax, lonMin, lonMax)
-        dist = limit(dist, 100, 50000)
-
-        lookAt = ('\t\t<LookAt>\n'
-                  '\t\t\t<latitude>{}</latitude>\n'
-                  '\t\t\t<longitude>{}</longitude>\n'
-                  '\t\t\t<altitudeMode>clampToGround</altitudeMode>\n'
-                  '\t\t\t<range>{}</range>\n'
-                  '\t\t\t<gx:TimeSpan>\n'
-                  '\t\t\t\t<begin>{}</begin>\n'
-                  '\t\t\t\t<end>{}</end>\n'
-                  '\t\t\t</gx:TimeSpan>\n'
-                  '\t\t</LookAt>\n'). \
-            format(latCen, lonCen, dist * 2, begin, end)
-
-        return lookAt
+        self.send_response(200)
+        self.send_header('Content-type', contentType)
+        self.send_header('Content-Length', str(len(data)))
+        if encoded:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(data)
 
     def __create_last(self):
         loc = self.server.currentLoc
@@ -461,109 +898,235 @@ class LocationServerHandler(BaseHTTPRequestHandler):
 
         return last
 
-    def __create_track(self):
-        if not len(self.server.locations):
-            return ''
-
-        track = "{0}{1}".format(('\t\t<Placemark>\n'
-                                 '\t\t\t<name>Track</name>\n'
-                                 '\t\t\t<description>{} locations</description>\n'
-                                 '\t\t\t<styleUrl>#track</styleUrl>\n'
-                                 '\t\t\t<gx:Track>\n'
-                                 '\t\t\t\t<altitudeMode>clampToGround</altitudeMode>\n'),
-                                format(len(self.server.locations)))
-
-        with self.server.lock:
-            for timeStamp in sorted(self.server.locations):
-                lat, lon, alt = self.server.locations[timeStamp]
-                timeStr = format_iso_time(timeStamp)
-                if alt is None:
-                    track += '\t\t\t\t<gx:coord>{} {}</gx:coord>\n'. \
-                        format(lon, lat)
+    def __create_kml(self):
+        lookAt, track = self.server.cache.get_kml_track()
+
+        kml = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<kml xmlns="http://www.opengis.net/kml/2.2" '
+               'xmlns:gx="http://www.google.com/kml/ext/2.2">\n')
+        kml += ('\t<Document>\n'
+                '\t\t<name>{}</name>\n').format(APP_NAME)
+        kml += lookAt
+        kml += ('\t\t<Style id="last">\n'
+                '\t\t\t<IconStyle>\n'
+                '\t\t\t\t<Icon>\n'
+                '\t\t\t\t\t<href>http://localhost:{}/crosshair.png</href>\n'
+                '\t\t\t\t</Icon>\n'
+                '\t\t\t\t<hotSpot x="0.5" y="0.5" xunits="fraction" yunits="fraction"/>\n'
+                '\t\t\t\t<scale>2</scale>\n'
+                '\t\t\t</IconStyle>\n'
+                '\t\t</Style>\n').format(LOCATION_PORT)
+        kml += ('\t\t<Style id="track">\n'
+                '\t\t\t<LineStyle>\n'
+                '\t\t\t\t<color>7f0000ff</color>\n'
+                '\t\t\t\t<width>4</width>\n'
+                '\t\t\t</LineStyle>\n'
+                '\t\t\t<IconStyle>\n'
+                '\t\t\t\t<scale>0</scale>\n'
+                '\t\t\t</IconStyle>\n'
+                '\t\t\t<LabelStyle>\n'
+                '\t\t\t\t<scale>0</scale>\n'
+                '\t\t\t</LabelStyle>\n'
+                '\t\t</Style>\n')
+        kml += self.__create_last()
+        kml += track
+        kml += ('\t</Document>\n'
+                '</kml>\n')
+
+        return kml.encode('utf-8')
 
-                else:
-                    track += '\t\t\t\t<gx:coord>{} {} {}</gx:coord>\n'. \
-                        format(lon, lat, alt)
-                track += '\t\t\t\t<when>{}</when>\n'.format(timeStr)
+    def __send_kml(self):
+        cache = self.server.cache
+        version = cache.update()
+        etag = self.__get_etag(version)
+        if self.__not_modified(etag):
+            return
 
-        track += ('\t\t\t</gx:Track>\n'
-                  '\t\t</Placemark>\n')
+        cached = cache.get_cached('kml')
+        if cached is not None and cached[0] == etag:
+            data = cached[1]
+        else:
+            data = self.__create_kml()
+            cache.set_cached('kml', version, (etag, data))
 
-        return track
+        self.__send_data(data, 'application/vnd.google-earth.kml+xml', etag)
 
-    def __send_kml(self):
-        self.send_response(200)
-        self.send_header('Content-type',
-                         'application/vnd.google-earth.kml+xml')
-        self.end_headers()
+    def __send_geojson(self, query):
+        cache = self.server.cache
+        version = cache.update()
+        since = None
+        if 'since' in query:
+            try:
+                since = float(query['since'][0])
+            except ValueError:
+                self.send_error(400)
+                return
 
-        self.wfile.write('<?xml version="1.0" encoding="UTF-8"?>\n'
-                         + '<kml xmlns="http://www.opengis.net/kml/2.2" '
-                         + 'xmlns:gx="http://www.google.com/kml/ext/2.2">\n')
-
-        self.wfile.write(('\t<Document>\n'
-                          + '\t\t<name>{}</name>\n').format(APP_NAME))
-
-        self.wfile.write(self.__create_lookat())
-
-        self.wfile.write(('\t\t<Style id="last">\n'
-                          + '\t\t\t<IconStyle>\n'
-                          + '\t\t\t\t<Icon>\n'
-                          + '\t\t\t\t\t<href>http://localhost:{}/crosshair.png</href>\n'
-                          + '\t\t\t\t</Icon>\n'
-                          + '\t\t\t\t<hotSpot x="0.5" y="0.5" xunits="fraction" yunits="fraction"/>\n'
-                          + '\t\t\t\t<scale>2</scale>\n'
-                          + '\t\t\t</IconStyle>\n'
-                          + '\t\t</Style>\n').format(LOCATION_PORT))
-
-        self.wfile.write('\t\t<Style id="track">\n'
-                         + '\t\t\t<LineStyle>\n'
-                         + '\t\t\t\t<color>7f0000ff</color>\n'
-                         + '\t\t\t\t<width>4</width>\n'
-                         + '\t\t\t</LineStyle>\n'
-                         + '\t\t\t<IconStyle>\n'
-                         + '\t\t\t\t<scale>0</scale>\n'
-                         + '\t\t\t</IconStyle>\n'
-                         + '\t\t\t<LabelStyle>\n'
-                         + '\t\t\t\t<scale>0</scale>\n'
-                         + '\t\t\t</LabelStyle>\n'
-                         + '\t\t</Style>\n')
-
-        self.wfile.write(self.__create_last())
-        self.wfile.write(self.__create_track())
-
-        self.wfile.write('\t</Document>\n'
-                         + '</kml>\n')
-
-    def __send_geojson(self):
-        self.send_response(200)
-        self.send_header('Content-type',
-                         'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
+        etag = self.__get_etag(version)
+        if since is not None:
+            etag = '{}-{}"'.format(etag[:-1], since)
+        if self.__not_modified(etag):
+            return
 
-        features = []
-        with self.server.lock:
-            for location in self.server.locations.values():
-                geometry = {'type': 'Point',
-                            'coordinates': location}
-                feature = {'type': 'Feature',
-                           'geometry': geometry}
-                features.append(feature)
+        cached = cache.get_cached('geojson')
+        if since is None and cached is not None and cached[0] == etag:
+            self.__send_data(cached[1], 'application/json', etag)
+            return
 
-        location = self.server.currentLoc
+        features = cache.get_features(since)
+        location = list(self.server.currentLoc)
         if location[0] is not None:
             geometry = {'type': 'Point',
-                        'coordinates': location}
+                        'coordinates': location[:3]}
             feature = {'type': 'Feature',
                        'geometry': geometry,
-                       'properties': {'isLast': True}}
+                       'properties': {'isLast': True,
+                                      'time': location[3]}}
             features.append(feature)
 
         data = {'Type': 'FeatureCollection',
                 'features': features}
+        data = json.dumps(data).encode('utf-8')
+        if since is None:
+            cache.set_cached('geojson', version, (etag, data))
+
+        self.__send_data(data, 'application/json', etag)
+
+    def __get_float(self, query, name):
+        if name not in query:
+            return None
+
+        return float(query[name][0])
+
+    def __get_bands(self, query):
+        bands = []
+        for band in query.get('band', []):
+            start, stop = band.split(':')
+            bands.append((float(start), float(stop)))
+
+        return bands
+
+    def __encode_json(self, sweeps):
+        data = [{'time': timeStamp,
+                 'freqs': freqs.tolist(),
+                 'levels': numpy.round(levels.astype(numpy.float64),
+                                       2).tolist()}
+                for timeStamp, freqs, levels in sweeps]
+
+        return json.dumps({'sweeps': data}).encode('utf-8')
+
+    def __encode_binary(self, sweeps):
+        data = [struct.pack('<4sHI', b'RFSW', 1, len(sweeps))]
+        for timeStamp, freqs, levels in sweeps:
+            data.append(struct.pack('<dI', timeStamp, len(freqs)))
+            data.append(freqs.astype('<f8').tobytes())
+            data.append(levels.astype('<f4').tobytes())
+
+        return b''.join(data)
+
+    def __send_spectrum(self, query, latest):
+        store = self.server.store
+        if store is None:
+            self.send_error(404)
+            return
+
+        try:
+            start = self.__get_float(query, 'start')
+            stop = self.__get_float(query, 'stop')
+            begin = self.__get_float(query, 'from')
+            end = self.__get_float(query, 'to')
+            points = query.get('points', [None])[0]
+            if points is not None:
+                points = int(points)
+                if points < 1:
+                    raise ValueError
+            binary = query.get('format', ['json'])[0] == 'bin'
+        except ValueError:
+            self.send_error(400)
+            return
+
+        if latest:
+            version, sweeps = store.get_latest()
+        else:
+            version, sweeps = store.get_sweeps(begin, end)
+
+        etag = '"{}-{}"'.format(version, self.path.replace('"', ''))
+        if self.__not_modified(etag):
+            return
+
+        sweeps = [(timeStamp,) + decimate_levels(*slice_levels(freqs, levels,
+                                                               start, stop),
+                                                 points=points)
+                  for timeStamp, freqs, levels in sweeps]
+
+        if binary:
+            data = self.__encode_binary(sweeps)
+            self.__send_data(data, 'application/octet-stream', etag)
+        else:
+            data = self.__encode_json(sweeps)
+            self.__send_data(data, 'application/json', etag)
 
-        self.wfile.write(json.dumps(data, indent=4))
+    def __send_bands(self, query):
+        store = self.server.store
+        if store is None:
+            self.send_error(404)
+            return
+
+        try:
+            bands = self.__get_bands(query)
+            mode = self.BAND_MODES[query.get('mode', ['mean'])[0]]
+        except (KeyError, ValueError):
+            self.send_error(400)
+            return
+
+        version, timeStamp, values = store.get_power(bands, mode)
+        etag = '"{}-{}"'.format(version, self.path.replace('"', ''))
+        if self.__not_modified(etag):
+            return
+
+        if values is None:
+            results = []
+        else:
+            timeStamp = float(timeStamp)
+            results = [{'start': start,
+                        'stop': stop,
+                        'level': float(value) if numpy.isfinite(value)
+                        else None}
+                       for (start, stop), value in zip(bands, values)]
+
+        data = {'time': timeStamp,
+                'bands': results}
+        data = json.dumps(data).encode('utf-8')
+        self.__send_data(data, 'application/json', etag)
+
+    def __send_stream(self):
+        stream = self.server.stream
+        if stream is None:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.close_connection = True
+
+        client = stream.subscribe()
+        try:
+            while True:
+                try:
+                    frame = client.get(timeout=self.KEEPALIVE)
+                except queue.Empty:
+                    frame = b': keepalive\n\n'
+                if frame is None:
+                    break
+                self.wfile.write(frame)
+                self.wfile.flush()
+        except (socket.error, ValueError):
+            pass
+        finally:
+            stream.unsubscribe(client)
 
     def __send_file(self):
         url = urlparse(self.path)
@@ -585,10 +1148,20 @@ class LocationServerHandler(BaseHTTPRequestHandler):
         f.close()
 
     def do_GET(self):
-        if self.path == '/kml':
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == '/kml':
             self.__send_kml()
-        elif self.path == '/gjson':
-            self.__send_geojson()
+        elif url.path == '/gjson':
+            self.__send_geojson(query)
+        elif url.path == '/spectrum/latest':
+            self.__send_spectrum(query, True)
+        elif url.path == '/spectrum':
+            self.__send_spectrum(query, False)
+        elif url.path == '/bands':
+            self.__send_bands(query)
+        elif url.path == '/stream':
+            self.__send_stream()
         else:
             self.__send_file()
 
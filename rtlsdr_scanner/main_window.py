@@ -52,15 +52,18 @@ from rtlsdr_scanner.dialogs_tools import DialogCompare, DialogAutoCal, DialogSat
     DialogLog
 from rtlsdr_scanner.events import EVENT_THREAD, Event, Log, EventTimer
 from rtlsdr_scanner.file import save_plot, export_plot, export_cont, open_plot, ScanInfo, export_image, \
-    export_map, extension_add, File, run_file, export_gpx, Backups
-from rtlsdr_scanner.location import ThreadLocation, LocationServer
+    export_map, extension_add, File, run_file, export_gpx, Backups, export_signals
+from rtlsdr_scanner.location import ThreadLocation, LocationServer, LocationTrack, \
+    SweepStream
 from rtlsdr_scanner.menus import MenuMain, PopMenuMain
 from rtlsdr_scanner.misc import get_dwells, limit, RemoteControl, calc_samples, calc_real_dwell, format_iso_time
 from rtlsdr_scanner.panels import PanelGraph
 from rtlsdr_scanner.printer import PrintOut
-from rtlsdr_scanner.scan import ThreadScan, update_spectrum, ThreadProcess
+from rtlsdr_scanner.scan import ThreadScan, update_spectrum, ThreadProcess, \
+    ScanCoordinator
 from rtlsdr_scanner.settings import Settings
-from rtlsdr_scanner.spectrum import count_points, Extent
+from rtlsdr_scanner.spectrum import count_points, Extent, SignalTracker, \
+    SweepStore
 from rtlsdr_scanner.toolbars import MFStatusbar, NavigationToolbar
 from rtlsdr_scanner.utils_google import create_gearth
 from rtlsdr_scanner.utils_mpl import add_colours
@@ -96,8 +99,9 @@ class FrameMain(wx.Frame):
         wx.Frame.__init__(self, None, title=title)
         self.lock = threading.Lock()
 
-        self.sdr = None
+        self.sdrs = {}
         self.threadScan = None
+        self.scanRanges = {}
         self.threadLocation = None
 
         self.queueScan = Queue()
@@ -139,6 +143,10 @@ class FrameMain(wx.Frame):
         self.scanInfo = ScanInfo()
         self.locations = OrderedDict()
         self.lastLocation = [None] * 4
+        self.track = LocationTrack()
+        self.tracker = SignalTracker()
+        self.store = SweepStore()
+        self.stream = SweepStream()
         self.backups = Backups()
 
         self.isSaved = True
@@ -191,14 +199,14 @@ class FrameMain(wx.Frame):
         self.stepsTotal = 0
 
         self.__start_gps()
-        # self.__start_location_server()
+        self.__start_location_server()
 
     def __create_toolbars(self):
         self.remoteControl = RemoteControl()
 
         self.graph = PanelGraph(self, self,
                                 self.settings, self.status,
-                                self.remoteControl)
+                                self.remoteControl, self.tracker)
 
         self.toolbar1 = wx.Panel(self)
 
@@ -337,6 +345,7 @@ class FrameMain(wx.Frame):
         self.Bind(wx.EVT_MENU, self.__on_export_image_seq, self.menuMain.exportSeq)
         self.Bind(wx.EVT_MENU, self.__on_export_geo, self.menuMain.exportGeo)
         self.Bind(wx.EVT_MENU, self.__on_export_track, self.menuMain.exportTrack)
+        self.Bind(wx.EVT_MENU, self.__on_export_signals, self.menuMain.exportSignals)
         self.Bind(wx.EVT_MENU, self.__on_export_cont, self.menuMain.exportCont)
         self.Bind(wx.EVT_MENU, self.__on_page, self.menuMain.page)
         self.Bind(wx.EVT_MENU, self.__on_preview, self.menuMain.preview)
@@ -417,6 +426,8 @@ class FrameMain(wx.Frame):
             return True
         self.spectrum.clear()
         self.locations.clear()
+        self.tracker.clear()
+        self.store.clear()
         self.__saved(True)
         self.__set_plot(self.spectrum, False)
         self.graph.clear_selection()
@@ -456,8 +467,11 @@ class FrameMain(wx.Frame):
             self.scanInfo, spectrum, locations = data
             self.spectrum.clear()
             self.locations.clear()
+            self.tracker.clear()
+            self.store.clear()
             self.spectrum.update(OrderedDict(sorted(spectrum.items())))
             self.locations.update(OrderedDict(sorted(locations.items())))
+            self.__update_views()
             self.__set_plot(self.spectrum, self.settings.annotate)
             self.graph.scale_plot(True)
             self.status.set_general("Finished")
@@ -528,7 +542,8 @@ class FrameMain(wx.Frame):
             exportType = dlgFile.GetFilterIndex()
             export_image(fullName, exportType,
                          self.graph.get_figure(),
-                         self.settings)
+                         self.settings,
+                         revision=self.graph.get_revision())
             self.status.set_general("Finished")
         dlgFile.Destroy()
 
@@ -585,6 +600,25 @@ class FrameMain(wx.Frame):
             self.status.set_general("Finished")
         dlg.Destroy()
 
+    def __on_export_signals(self, _event):
+        dlg = wx.FileDialog(self, "Export signals to file",
+                            self.settings.dirExport,
+                            self.filename,
+                            File.get_type_filters(File.Types.SIGNALS),
+                            wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
+        if dlg.ShowModal() == wx.ID_OK:
+            self.status.set_general("Exporting...")
+            fileName = dlg.GetFilename()
+            dirName = dlg.GetDirectory()
+            self.settings.dirExport = dirName
+            fileName = extension_add(fileName, dlg.GetFilterIndex(),
+                                     File.Types.SIGNALS)
+            fullName = os.path.join(dirName, fileName)
+            signals, duty = self.tracker.get_signals()
+            export_signals(fullName, signals, duty)
+            self.status.set_general("Finished")
+        dlg.Destroy()
+
     def __on_export_cont(self, _event):
         if self.exportCont is None:
             dlg = wx.FileDialog(self, 'Continuous export',
@@ -646,7 +680,7 @@ class FrameMain(wx.Frame):
             return
         self.__scan_stop(False)
         self.__stop_gps(False)
-        # self.__stop_location_server()
+        self.__stop_location_server()
         self.__get_controls()
         self.settings.devicesRtl = self.devicesRtl
         self.settings.save()
@@ -657,6 +691,7 @@ class FrameMain(wx.Frame):
         self.__get_controls()
         dlg = DialogPrefs(self, self.settings)
         if dlg.ShowModal() == wx.ID_OK:
+            self.graph.set_frame_rate(self.settings.frameRate)
             self.graph.create_plot()
             self.__set_control_state(True)
             self.__set_controls()
@@ -722,6 +757,7 @@ class FrameMain(wx.Frame):
                 self.spectrum.clear()
                 spectrum = dlg.get_spectrum()
                 self.spectrum.update(spectrum.items())
+                self.__update_views()
                 self.__set_plot(self.spectrum, False)
                 self.graph.update_measure()
                 self.graph.redraw_plot()
@@ -905,19 +941,21 @@ class FrameMain(wx.Frame):
             self.__auto_cal(Cal.DONE)
         elif status == Event.INFO:
             if self.threadScan is not None:
-                self.sdr = self.threadScan.get_sdr()
+                self.sdrs.update(self.threadScan.get_sdrs())
                 if arg2 is not None:
-                    self.devicesRtl[self.settings.indexRtl].tuner = arg2
-                    self.scanInfo.tuner = arg2
+                    self.devicesRtl[arg1].tuner = arg2
+                    if arg1 == self.settings.indexRtl:
+                        self.scanInfo.tuner = arg2
         elif status == Event.DATA:
             self.__saved(False)
-            cal = self.devicesRtl[self.settings.indexRtl].calibration
-            levelOff = self.devicesRtl[self.settings.indexRtl].levelOff
-            freq, scan = self.queueScan.get()
+            freq, scan, device = self.queueScan.get()
+            cal = self.devicesRtl[device].calibration
+            levelOff = self.devicesRtl[device].levelOff
             process = ThreadProcess(self, freq, scan, cal, levelOff,
                                     self.settings.nfft,
                                     self.settings.overlap,
-                                    self.settings.winFunc)
+                                    self.settings.winFunc,
+                                    device)
             process.start()
             self.__progress()
         elif status == Event.STOPPED:
@@ -934,7 +972,8 @@ class FrameMain(wx.Frame):
             wx.MessageBox(arg2, 'Error',
                           wx.OK | wx.ICON_ERROR)
         elif status == Event.PROCESSED:
-            offset = self.settings.devicesRtl[self.settings.indexRtl].offset
+            offset = self.settings.devicesRtl[arg2].offset
+            start, stop = self.scanRanges[arg2]
             if self.settings.alert:
                 alert = self.settings.alertLevel
             else:
@@ -942,8 +981,8 @@ class FrameMain(wx.Frame):
             try:
                 Thread(target=update_spectrum, name='Update',
                        args=(self, self.lock,
-                             self.settings.start,
-                             self.settings.stop,
+                             start,
+                             stop,
                              arg1,
                              offset,
                              self.spectrum,
@@ -1050,7 +1089,10 @@ class FrameMain(wx.Frame):
             if self.isNewScan:
                 self.spectrum.clear()
                 self.locations.clear()
+                self.tracker.clear()
+                self.store.clear()
                 self.graph.clear_plots()
+                self.graph.clear_frame_stats()
 
                 self.isNewScan = False
                 self.status.set_info('', level=None)
@@ -1061,8 +1103,21 @@ class FrameMain(wx.Frame):
 
             self.stopAtEnd = False
             self.stopScan = False
-            self.threadScan = ThreadScan(self, self.queueScan, self.sdr, self.settings,
-                                         self.settings.indexRtl, samples, isCal)
+            if self.settings.multiDevice and not isCal and \
+                    len(self.devicesRtl) > 1:
+                devices = list(range(len(self.devicesRtl)))
+                self.__close_sdrs(devices)
+                self.threadScan = ScanCoordinator(self, self.queueScan,
+                                                  self.settings,
+                                                  devices,
+                                                  samples, self.sdrs)
+            else:
+                self.__close_sdrs([self.settings.indexRtl])
+                self.threadScan = ThreadScan(self, self.queueScan,
+                                             self.sdrs.get(self.settings.indexRtl),
+                                             self.settings,
+                                             self.settings.indexRtl, samples, isCal)
+            self.scanRanges = self.threadScan.get_ranges()
             self.filename = "Scan {0:.1f}-{1:.1f}MHz".format(self.settings.start,
                                                              self.settings.stop)
             self.graph.set_plot_title()
@@ -1078,10 +1133,13 @@ class FrameMain(wx.Frame):
             if join:
                 self.threadScan.join()
         self.threadScan = None
-        if self.sdr is not None:
-            self.sdr.close()
+        self.__close_sdrs()
         self.__set_control_state(True)
 
+    def __close_sdrs(self, keep=()):
+        for device in [device for device in self.sdrs if device not in keep]:
+            self.sdrs.pop(device).close()
+
     def __progress(self):
         if self.steps == self.stepsTotal:
             self.status.set_general("Scanning ({} sweeps)".format(len(self.spectrum)))
@@ -1092,9 +1150,12 @@ class FrameMain(wx.Frame):
             self.__limit_spectrum()
             self.status.show_progress()
         else:
+            self.__geotag()
             if self.settings.backup:
                 self.backups.save(self.scanInfo, self.spectrum, self.locations)
             self.status.hide_progress()
+            self.__update_views()
+            self.__publish_sweep()
             self.__set_plot(self.spectrum, self.settings.annotate)
             if self.exportCont is not None:
                 last = next(reversed(self.spectrum))
@@ -1128,14 +1189,16 @@ class FrameMain(wx.Frame):
             self.scanDelayTimer.Stop()
             self.scanDelayTimer = None
 
-        if self.sdr is not None:
-            self.sdr.close()
-            self.sdr = None
+        self.__close_sdrs()
 
         self.status.hide_progress()
         self.steps = 0
         self.threadScan = None
         self.__set_control_state(True)
+        rendered, dropped = self.graph.get_frame_stats()
+        self.log.add('Frames rendered: {}, dropped: {}'.format(rendered,
+                                                               dropped),
+                     Log.INFO)
         self.stopAtEnd = False
         self.stopScan = True
         self.isScanning = False
@@ -1160,7 +1223,8 @@ class FrameMain(wx.Frame):
             self.status.enable_gps()
             if self.threadLocation is None:
                 device = self.settings.devicesGps[self.settings.indexGps]
-                self.threadLocation = ThreadLocation(self, device)
+                self.threadLocation = ThreadLocation(self, device,
+                                                     rate=self.settings.gpsRate)
         else:
             self.status.disable_gps()
 
@@ -1170,41 +1234,52 @@ class FrameMain(wx.Frame):
             if join:
                 self.threadLocation.join()
         self.threadLocation = None
-    #
-    # def __start_location_server(self):
-    #     self.serverLocation = LocationServer(self.locations, self.lastLocation,
-    #                                          self.lock, self.log)
-    #
-    # def __stop_location_server(self):
-    #     if self.serverLocation:
-    #         self.serverLocation.close()
-    #
-    # def __update_location(self, data):
-    #     i = 0
-    #     for loc in data:
-    #         self.lastLocation[i] = loc
-    #         i += 1
-    #     self.status.pulse_gps()
-    #     if data[2] is None:
-    #         gpsStatus = '{:.5f}, {:.5f}'.format(data[0], data[1])
-    #     else:
-    #         gpsStatus = '{:.5f}, {:.5f}, {:.1f}m'.format(data[0], data[1], data[2])
-    #
-    #     self.status.set_gps(gpsStatus, level=None)
-    #
-    #     if not self.isScanning:
-    #         return
-    #
-    #     if self.scanInfo is not None:
-    #         if data[0] and data[1]:
-    #             self.scanInfo.lat = str(data[0])
-    #             self.scanInfo.lon = str(data[1])
-    #
-    #     with self.lock:
-    #         if len(self.spectrum) > 0:
-    #             self.locations[max(self.spectrum)] = (data[0],
-    #                                                   data[1],
-    #                                                   data[2])
+
+    def __start_location_server(self):
+        try:
+            self.serverLocation = LocationServer(self.locations,
+                                                 self.lastLocation,
+                                                 self.lock, self.log,
+                                                 self.store, self.stream)
+        except OSError as error:
+            self.serverLocation = None
+            self.status.set_general('Location server: {}'.format(error),
+                                    level=Log.WARN)
+
+    def __stop_location_server(self):
+        if self.serverLocation:
+            self.serverLocation.close()
+            self.serverLocation = None
+
+    def __update_location(self, data):
+        i = 0
+        for loc in data:
+            self.lastLocation[i] = loc
+            i += 1
+        self.track.add(*data)
+        self.status.pulse_gps()
+        if data[2] is None:
+            gpsStatus = '{:.5f}, {:.5f}'.format(data[0], data[1])
+        else:
+            gpsStatus = '{:.5f}, {:.5f}, {:.1f}m'.format(data[0], data[1], data[2])
+
+        self.status.set_gps(gpsStatus, level=None)
+
+        if not self.isScanning:
+            return
+
+        if self.scanInfo is not None:
+            if data[0] and data[1]:
+                self.scanInfo.lat = str(data[0])
+                self.scanInfo.lon = str(data[1])
+
+    def __geotag(self):
+        with self.lock:
+            if len(self.spectrum):
+                latest = next(reversed(self.spectrum))
+                self.track.geotag(self.spectrum, self.locations,
+                                  (latest + time.time()) / 2.)
+                self.track.trim(min(self.spectrum))
 
     def __saved(self, isSaved):
         self.isSaved = isSaved
@@ -1213,6 +1288,16 @@ class FrameMain(wx.Frame):
             title += "*"
         self.SetTitle(title)
 
+    def __update_views(self):
+        with self.lock:
+            self.tracker.update(self.spectrum, self.settings)
+            self.store.update(self.spectrum)
+
+    def __publish_sweep(self):
+        _version, sweeps = self.store.get_latest()
+        if len(sweeps):
+            self.stream.publish(*sweeps[0])
+
     def __set_plot(self, spectrum, annotate):
         if len(spectrum) > 0:
             total = count_points(spectrum)
@@ -1372,8 +1457,11 @@ class FrameMain(wx.Frame):
         if len(spectrum) > 0:
             self.spectrum.clear()
             self.locations.clear()
+            self.tracker.clear()
+            self.store.clear()
             self.spectrum.update(OrderedDict(sorted(spectrum.items())))
             self.locations.update(OrderedDict(sorted(locations.items())))
+            self.__update_views()
             self.__set_plot(self.spectrum, self.settings.annotate)
             self.graph.scale_plot(True)
             self.status.set_general("Finished")
@@ -1402,6 +1490,7 @@ class FrameMain(wx.Frame):
             self.spectrum = spectrum
             self.locations.clear()
             self.locations.update(location)
+            self.__update_views()
             self.__saved(True)
             self.__set_controls()
             self.__set_control_state(True)
@@ -56,6 +56,8 @@ class MenuMain:
                                      "Export maps")
         self.exportTrack = file.Append(wx.ID_ANY, "Export GPS track...",
                                        "Export GPS data")
+        self.exportSignals = file.Append(wx.ID_ANY, "Export signals...",
+                                         "Export tracked signals")
 
         file.AppendSeparator()
         self.exportCont = file.Append(wx.ID_ANY, "Continuous export...",
@@ -174,6 +176,7 @@ class MenuMain:
         self.exportSeq.Enable(state and len(spectrum))
         self.exportGeo.Enable(state and len(spectrum) and len(locations) > 4)
         self.exportTrack.Enable(state and len(locations))
+        self.exportSignals.Enable(state and len(spectrum))
         self.exportCont.Enable(state)
         self.page.Enable(state)
         self.preview.Enable(state)
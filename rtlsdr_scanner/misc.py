@@ -184,6 +184,24 @@ def format_precision(settings, freq=None, level=None,
     return None
 
 
+def parse_bands(text):
+    bands = []
+    for band in text.replace(';', ',').split(','):
+        band = band.strip()
+        if not len(band):
+            continue
+        start, stop = [float(freq) for freq in band.split('-')]
+        if stop <= start:
+            raise ValueError('Invalid band: {}'.format(band))
+        bands.append((start, stop))
+
+    return bands
+
+
+def format_band(band):
+    return '{:g}-{:g}MHz'.format(*band)
+
+
 def format_time(timeStamp, withDate=False):
     if timeStamp <= 1:
         return 'Unknown'
@@ -45,10 +45,12 @@ from wx.grid import Grid, EVT_GRID_CELL_RIGHT_CLICK, EVT_GRID_CELL_LEFT_CLICK, E
     GridCellBoolEditor, GridCellFloatEditor
 
 from rtlsdr_scanner.constants import Display
+from rtlsdr_scanner.events import FrameScheduler
 from rtlsdr_scanner.misc import format_precision
 from rtlsdr_scanner.plot_3d import Plotter3d
 from rtlsdr_scanner.plot_controls import MouseZoom, MouseSelect
 from rtlsdr_scanner.plot_line import Plotter
+from rtlsdr_scanner.plot_signals import PlotterSignals
 from rtlsdr_scanner.plot_spect import Spectrogram
 from rtlsdr_scanner.plot_status import PlotterStatus
 from rtlsdr_scanner.plot_time import PlotterTime
@@ -61,18 +63,21 @@ from rtlsdr_scanner.widgets import GridToolTips, CheckBoxCellRenderer
 
 class PanelGraph(wx.Panel):
 
-    def __init__(self, panel, notify, settings, status, remoteControl):
+    def __init__(self, panel, notify, settings, status, remoteControl,
+                 tracker):
         self.panel = panel
         self.notify = notify
         self.plot = None
         self.settings = settings
         self.status = status
         self.remoteControl = remoteControl
+        self.tracker = tracker
         self.spectrum = None
         self.isLimited = None
         self.limit = None
         self.extent = None
         self.annotate = None
+        self.revision = 0
 
         self.isDrawing = False
 
@@ -92,8 +97,6 @@ class PanelGraph(wx.Panel):
         self.measure = None
         self.show = None
 
-        self.doDraw = False
-
         wx.Panel.__init__(self, panel)
 
         self.figure = matplotlib.figure.Figure(facecolor='white')
@@ -114,6 +117,11 @@ class PanelGraph(wx.Panel):
         self.SetSizer(vbox)
         vbox.Fit(self)
 
+        self.scheduler = FrameScheduler(settings.frameRate,
+                                        self.__is_busy,
+                                        self.__plot_frame,
+                                        self.__draw_frame)
+
         self.create_plot()
 
         self.canvas.mpl_connect('button_press_event', self.__on_press)
@@ -121,12 +129,8 @@ class PanelGraph(wx.Panel):
         self.canvas.mpl_connect('axes_leave_event', self.__on_leave)
         self.canvas.mpl_connect('motion_notify_event', self.__on_motion)
         self.canvas.mpl_connect('draw_event', self.__on_draw)
-        self.Bind(wx.EVT_IDLE, self.__on_idle)
         self.Bind(wx.EVT_SIZE, self.__on_size)
 
-        self.timer = wx.Timer(self)
-        self.Bind(wx.EVT_TIMER, self.__on_timer, self.timer)
-
     def __set_fonts(self):
         axes = self.plot.get_axes()
         if axes is not None:
@@ -241,23 +245,38 @@ class PanelGraph(wx.Panel):
         event.Skip()
 
     def __on_draw(self, _event):
+        self.revision += 1
         axes = self.plot.get_axes()
         if axes is not None:
             self.background = self.canvas.copy_from_bbox(axes.bbox)
             self.__draw_overlay()
 
-    def __on_idle(self, _event):
-        if self.doDraw and self.plot.get_plot_thread() is None:
-            self.__hide_overlay()
-            self.doDraw = False
-            if os.name == 'nt':
-                threading.Thread(target=self.__draw_canvas, name='Draw').start()
-            else:
-                self.__draw_canvas()
+    def __is_busy(self):
+        return self.plot.get_plot_thread() is not None or self.isDrawing
+
+    def __plot_frame(self):
+        if self.spectrum is None:
+            self.__draw_frame()
+            return
+
+        self.measureTable.set_selected(self.spectrum, self.selectStart,
+                                       self.selectEnd)
+
+        spectrum = self.spectrum
+        if self.isLimited:
+            spectrum = reduce_points(spectrum, self.limit)
+
+        self.status.set_busy(True)
+        self.plot.set_plot(spectrum, self.extent, self.annotate)
+        if self.settings.display == Display.PREVIEW:
+            self.status.set_busy(False)
 
-    def __on_timer(self, _event):
-        self.timer.Stop()
-        self.set_plot(None, None, None, None, self.annotate)
+    def __draw_frame(self):
+        self.__hide_overlay()
+        if os.name == 'nt':
+            threading.Thread(target=self.__draw_canvas, name='Draw').start()
+        else:
+            self.__draw_canvas()
 
     def __draw_canvas(self):
         try:
@@ -307,6 +326,9 @@ class PanelGraph(wx.Panel):
             self.plot = PlotterStatus(self.notify, self.figure, self.settings)
         elif self.settings.display == Display.TIMELINE:
             self.plot = PlotterTime(self.notify, self.figure, self.settings)
+        elif self.settings.display == Display.SIGNALS:
+            self.plot = PlotterSignals(self.notify, self.figure, self.settings,
+                                       self.tracker)
 
         self.__set_fonts()
 
@@ -339,7 +361,7 @@ class PanelGraph(wx.Panel):
         menu.Enable(False)
 
     def draw(self):
-        self.doDraw = True
+        self.scheduler.schedule_draw()
 
     def show_measure_table(self, show):
         self.measureTable.show(show)
@@ -354,21 +376,8 @@ class PanelGraph(wx.Panel):
                 self.isLimited = isLimited
                 self.limit = limit
 
-        if self.plot.get_plot_thread() is None and not self.isDrawing:
-            self.timer.Stop()
-            self.measureTable.set_selected(self.spectrum, self.selectStart,
-                                           self.selectEnd)
-
-            if isLimited:
-                self.spectrum = reduce_points(spectrum, limit)
-
-            self.status.set_busy(True)
-            self.plot.set_plot(self.spectrum, self.extent, annotate)
-            if self.settings.display == Display.PREVIEW:
-                self.status.set_busy(False)
-
-        else:
-            self.timer.Start(200, oneShot=True)
+        self.revision += 1
+        self.scheduler.schedule_plot()
 
     def set_plot_title(self):
         if len(self.settings.devicesRtl) > 0:
@@ -416,6 +425,9 @@ class PanelGraph(wx.Panel):
     def get_figure(self):
         return self.figure
 
+    def get_revision(self):
+        return self.revision
+
     def get_axes(self):
         return self.plot.get_axes()
 
@@ -428,13 +440,23 @@ class PanelGraph(wx.Panel):
     def get_mouse_select(self):
         return self.mouseSelect
 
+    def get_frame_stats(self):
+        return self.scheduler.get_stats()
+
+    def clear_frame_stats(self):
+        self.scheduler.clear_stats()
+
+    def set_frame_rate(self, frameRate):
+        self.scheduler.set_rate(frameRate)
+
     def scale_plot(self, force=False):
         self.plot.scale_plot(force)
 
     def clear_plots(self):
         self.plot.clear_plots()
         self.spectrum = None
-        self.doDraw = True
+        self.revision += 1
+        self.scheduler.schedule_draw()
 
     def clear_selection(self):
         self.measure = None
@@ -445,6 +467,7 @@ class PanelGraph(wx.Panel):
         self.__enable_menu(False)
 
     def close(self):
+        self.scheduler.Stop()
         self.plot.close()
         close_modeless()
 
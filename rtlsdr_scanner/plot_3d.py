@@ -23,7 +23,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-import threading
 import time
 
 from matplotlib import cm, patheffects
@@ -33,12 +32,14 @@ from matplotlib.colors import Normalize, hex2color
 from matplotlib.dates import DateFormatter
 from matplotlib.gridspec import GridSpec
 from matplotlib.ticker import ScalarFormatter, AutoMinorLocator
+import numpy
 
 from rtlsdr_scanner.constants import PlotFunc
 from rtlsdr_scanner.events import post_event, EventThread, Event
 from rtlsdr_scanner.misc import format_time, format_precision
+from rtlsdr_scanner.plot_worker import PlotWorker, PlotJob
 from rtlsdr_scanner.spectrum import create_mesh, smooth_spectrum, Extent, diff_spectrum, \
-    get_peaks
+    get_peaks, decimate_mesh
 from rtlsdr_scanner.utils_mpl import utc_to_mpl
 
 
@@ -51,8 +52,9 @@ class Plotter3d:
         self.bar = None
         self.barBase = None
         self.plot = None
+        self.plotWireframe = None
         self.extent = None
-        self.threadPlot = None
+        self.worker = PlotWorker()
         self.__setup_plot()
         self.set_grid(settings.grid)
 
@@ -102,6 +104,43 @@ class Plotter3d:
             if self.settings.autoT or force:
                 self.axes.set_ylim(self.extent.get_t())
 
+    @staticmethod
+    def __get_polys(x, y, z):
+        corners = [(slice(None, -1), slice(None, -1)),
+                   (slice(1, None), slice(None, -1)),
+                   (slice(1, None), slice(1, None)),
+                   (slice(None, -1), slice(1, None))]
+        polys = numpy.stack([numpy.stack((x[corner], y[corner], z[corner]),
+                                         axis=-1)
+                             for corner in corners], axis=2)
+        polys = polys.reshape(-1, 4, 3)
+        polys = polys[numpy.isfinite(polys).all(axis=(1, 2))]
+
+        return polys, polys[:, :, 2].mean(axis=1)
+
+    @staticmethod
+    def __get_lines(x, y, z):
+        points = numpy.stack((x, y, z), axis=-1)
+        lines = list(points) + list(points.transpose(1, 0, 2))
+
+        return [line[numpy.isfinite(line).all(axis=1)] for line in lines]
+
+    def update_mesh(self, x, y, z, vmin, vmax):
+        if self.plot is None or self.plot not in self.axes.collections:
+            return False
+        if self.plotWireframe != self.settings.wireframe:
+            return False
+
+        if self.settings.wireframe:
+            self.plot.set_segments(self.__get_lines(x, y, z))
+        else:
+            polys, levels = self.__get_polys(x, y, z)
+            self.plot.set_verts(polys)
+            self.plot.set_array(levels)
+            self.plot.set_clim(vmin, vmax)
+
+        return True
+
     def draw_measure(self, *args):
         pass
 
@@ -122,20 +161,19 @@ class Plotter3d:
         return self.barBase
 
     def get_plot_thread(self):
-        return self.threadPlot
+        return self.worker.get_job()
 
     def set_title(self, title):
         self.axes.set_title(title, fontsize='medium')
 
     def set_plot(self, spectrum, extent, annotate=False):
         self.extent = extent
-        self.threadPlot = ThreadPlot(self, self.settings,
-                                     self.axes,
-                                     spectrum,
-                                     self.extent,
-                                     self.barBase,
-                                     annotate)
-        self.threadPlot.start()
+        return self.worker.submit(JobPlot(self, self.settings,
+                                          self.axes,
+                                          spectrum,
+                                          self.extent,
+                                          self.barBase,
+                                          annotate))
 
     def clear_plots(self):
         children = self.axes.get_children()
@@ -158,15 +196,15 @@ class Plotter3d:
             pass
 
     def close(self):
+        self.worker.stop()
         self.figure.clear()
         self.figure = None
 
 
-class ThreadPlot(threading.Thread):
+class JobPlot(PlotJob):
     def __init__(self, parent, settings, axes, data, extent,
                  barBase, annotate):
-        threading.Thread.__init__(self)
-        self.name = "Plot"
+        PlotJob.__init__(self)
         self.parent = parent
         self.settings = settings
         self.axes = axes
@@ -177,7 +215,6 @@ class ThreadPlot(threading.Thread):
 
     def run(self):
         if self.data is None:
-            self.parent.threadPlot = None
             return
         peakF, peakL, peakT = 0, 0, 0
         total = len(self.data)
@@ -200,11 +237,10 @@ class ThreadPlot(threading.Thread):
             self.parent.scale_plot()
             self.parent.redraw_plot()
 
-        self.parent.threadPlot = None
-
     def __plot(self, spectrum):
         x, y, z = create_mesh(spectrum, True)
-        self.parent.clear_plots()
+        if self.settings.meshLimit:
+            x, y, z = decimate_mesh(x, y, z, self.settings.meshMax)
 
         if self.settings.autoL:
             vmin, vmax = self.barBase.get_clim()
@@ -212,6 +248,13 @@ class ThreadPlot(threading.Thread):
             zExtent = self.extent.get_l()
             vmin = zExtent[0]
             vmax = zExtent[1]
+
+        if self.settings.meshReuse and \
+                self.parent.update_mesh(x, y, z, vmin, vmax):
+            return self.extent.get_peak_flt()
+
+        self.parent.clear_plots()
+        self.parent.plotWireframe = self.settings.wireframe
         if self.parent.settings.wireframe:
             self.parent.plot = \
                 self.axes.plot_wireframe(x, y, z,
@@ -274,11 +317,12 @@ class ThreadPlot(threading.Thread):
                            color='r', gid='peak', path_effects=[effect])
 
     def __plot_peaks(self):
-        sweep, indices = get_peaks(self.data, self.settings.peaksThres)
+        peaks = get_peaks(self.data, self.settings)
         lastTime = utc_to_mpl(max(self.data))
 
-        for i in indices:
-            self.axes.plot([sweep.keys()[i]], [lastTime], [sweep.values()[i]],
+        if len(peaks):
+            self.axes.plot(peaks['freq'], [lastTime] * len(peaks),
+                           peaks['level'],
                            linestyle='None',
                            marker='+', markersize=10, color='r',
                            gid='peakThres')
@@ -24,7 +24,6 @@
 #
 
 from collections import OrderedDict
-import threading
 
 from matplotlib import patheffects
 import matplotlib
@@ -41,6 +40,7 @@ import numpy
 from rtlsdr_scanner.constants import Markers, PlotFunc
 from rtlsdr_scanner.events import EventThread, Event, post_event
 from rtlsdr_scanner.misc import format_precision
+from rtlsdr_scanner.plot_worker import PlotWorker, PlotJob
 from rtlsdr_scanner.spectrum import Measure, Extent, smooth_spectrum, \
     diff_spectrum, delta_spectrum, get_peaks
 from rtlsdr_scanner.utils_mpl import get_colours
@@ -77,7 +77,7 @@ class Plotter:
         self.axes = None
         self.bar = None
         self.barBase = None
-        self.threadPlot = None
+        self.worker = PlotWorker()
         self.extent = None
         self.lines = {}
         self.labels = {}
@@ -363,22 +363,31 @@ class Plotter:
         return self.barBase
 
     def get_plot_thread(self):
-        return self.threadPlot
+        return self.worker.get_job()
 
     def set_title(self, title):
         self.axes.set_title(title, fontsize='medium')
 
     def set_plot(self, spectrum, extent, annotate=False):
         self.extent = extent
-        self.threadPlot = ThreadPlot(self, self.settings,
-                                     self.axes,
-                                     spectrum,
-                                     self.extent,
-                                     self.barBase,
-                                     annotate)
-        self.threadPlot.start()
+        return self.worker.submit(JobPlot(self, self.settings,
+                                          self.axes,
+                                          spectrum,
+                                          self.extent,
+                                          self.barBase,
+                                          annotate))
 
-        return self.threadPlot
+    def update_sweep(self, sweep):
+        plots = [collection for collection in self.axes.collections
+                 if collection.get_gid() == 'plot']
+        if len(plots) != 1 or len(sweep) < 2:
+            return False
+
+        points = numpy.array(list(sweep.items()))
+        plots[0].set_segments(numpy.stack((points[:-1], points[1:]), axis=1))
+        plots[0].set_array((points[:-1, 1] + points[1:, 1]) / 2.)
+
+        return True
 
     def clear_plots(self):
         children = self.axes.get_children()
@@ -436,16 +445,16 @@ class Plotter:
             pass
 
     def close(self):
+        self.worker.stop()
         if self.figure is not None:
             self.figure.clear()
             self.figure = None
 
 
-class ThreadPlot(threading.Thread):
+class JobPlot(PlotJob):
     def __init__(self, parent, settings, axes, data, extent,
                  barBase, annotate):
-        threading.Thread.__init__(self)
-        self.name = "Plot"
+        PlotJob.__init__(self)
         self.parent = parent
         self.settings = settings
         self.axes = axes
@@ -461,7 +470,6 @@ class ThreadPlot(threading.Thread):
 
     def run(self):
         if self.data is None:
-            self.parent.threadPlot = None
             return
         peakF, peakL = 0, 0
         total = len(self.data)
@@ -496,8 +504,6 @@ class ThreadPlot(threading.Thread):
             self.parent.scale_plot()
             self.parent.redraw_plot()
 
-        self.parent.threadPlot = None
-
     def __plot_all(self, spectrum):
         total = len(spectrum)
         count = 0.0
@@ -655,10 +661,10 @@ class ThreadPlot(threading.Thread):
                            path_effects=[effect], gid='peak')
 
     def __plot_peaks(self):
-        sweep, indices = get_peaks(self.data, self.settings.peaksThres)
+        peaks = get_peaks(self.data, self.settings)
 
-        for i in indices:
-            self.axes.plot(sweep.keys()[i], sweep.values()[i],
+        if len(peaks):
+            self.axes.plot(peaks['freq'], peaks['level'],
                            linestyle='None',
                            marker='+', markersize=10, color='r',
                            gid='peakThres')
@@ -0,0 +1,180 @@
+#
+# rtlsdr_scan
+#
+# http://eartoearoak.com/software/rtlsdr-scanner
+#
+# Copyright 2012 - 2015 Al Brown
+#
+# A frequency scanning GUI for the OsmoSDR rtl-sdr library at
+# http://sdr.osmocom.org/trac/wiki/rtl-sdr
+#
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from matplotlib.font_manager import FontProperties
+from matplotlib.table import Table
+import numpy
+
+from rtlsdr_scanner.events import post_event, EventThread, Event
+from rtlsdr_scanner.misc import format_time, format_precision
+from rtlsdr_scanner.plot_worker import PlotWorker, PlotJob
+from rtlsdr_scanner.spectrum import SignalTracker
+from rtlsdr_scanner.utils_mpl import find_artists, set_table_colour
+
+
+class PlotterSignals:
+    ROWS = 20
+
+    def __init__(self, notify, figure, settings, tracker=None):
+        self.notify = notify
+        self.figure = figure
+        self.settings = settings
+        self.tracker = tracker
+        self.axes = None
+        self.worker = PlotWorker()
+        self.barBase = None
+        self.__setup_plot()
+        self.set_grid(self.settings.grid)
+        self.set_plot(None, None, False)
+
+    def __setup_plot(self):
+        self.axes = self.figure.add_subplot(111)
+        self.axes.set_axis_off()
+
+    def draw_measure(self, _measure, _show):
+        pass
+
+    def hide_measure(self):
+        pass
+
+    def scale_plot(self, _force=False):
+        pass
+
+    def redraw_plot(self):
+        if self.figure is not None:
+            post_event(self.notify, EventThread(Event.DRAW))
+
+    def get_axes(self):
+        return None
+
+    def get_axes_bar(self):
+        return None
+
+    def get_bar(self):
+        return self.barBase
+
+    def get_plot_thread(self):
+        return self.worker.get_job()
+
+    def set_title(self, title):
+        self.axes.set_title(title, fontsize='medium')
+
+    def set_plot(self, spectrum, extent, _annotate=False):
+        return self.worker.submit(JobPlot(self, self.settings, self.axes,
+                                          spectrum, self.tracker))
+
+    def clear_plots(self):
+        table = find_artists(self.figure, 'table')
+        if table:
+            table[0].remove()
+
+    def set_grid(self, on):
+        table = find_artists(self.axes, 'table')
+        if len(table):
+            if on:
+                colour = 'LightGray'
+            else:
+                colour = 'w'
+            set_table_colour(table[0], colour)
+            self.redraw_plot()
+
+    def close(self):
+        self.worker.stop()
+        self.figure.clear()
+        self.figure = None
+
+
+class JobPlot(PlotJob):
+    def __init__(self, parent, settings, axes, data, tracker):
+        PlotJob.__init__(self)
+        self.parent = parent
+        self.settings = settings
+        self.axes = axes
+        self.data = data
+        self.tracker = tracker
+
+    def run(self):
+        tracker = self.tracker
+        if tracker is None:
+            tracker = SignalTracker()
+            if self.data is not None:
+                tracker.update(self.data, self.settings)
+        signals, duty = tracker.get_signals()
+
+        if len(signals) > PlotterSignals.ROWS:
+            strongest = numpy.argsort(-signals['maxLevel'],
+                                      kind='mergesort')[:PlotterSignals.ROWS]
+            strongest.sort()
+            signals = signals[strongest]
+            duty = duty[strongest]
+
+        text = [['Frequency', 'Level', 'Max level', 'Bandwidth',
+                 'Duty cycle', 'First seen', 'Last seen']]
+        for signal, cycle in zip(signals, duty):
+            text.append([format_precision(self.settings,
+                                          freq=signal['freq']),
+                         format_precision(self.settings,
+                                          level=signal['level']),
+                         format_precision(self.settings,
+                                          level=signal['maxLevel']),
+                         '{:.1f} kHz'.format(signal['bandwidth'] * 1000),
+                         '{:.0f}%'.format(cycle),
+                         format_time(signal['first']),
+                         format_time(signal['last'])])
+        if len(text) == 1:
+            text.append(['-'] * len(text[0]))
+
+        self.parent.clear_plots()
+        table = Table(self.axes, loc='center')
+        table.set_gid('table')
+
+        rows = len(text)
+        cols = len(text[0])
+        fontProperties = FontProperties()
+        fontProperties.set_weight('semibold')
+        for row in range(rows):
+            for col in range(cols):
+                fp = fontProperties if row == 0 else None
+                table.add_cell(row, col,
+                               text=text[row][col],
+                               fontproperties=fp,
+                               width=1.0 / cols, height=1.0 / rows)
+
+        if self.settings.grid:
+            colour = 'LightGray'
+        else:
+            colour = 'w'
+        set_table_colour(table, colour)
+
+        for i in range(cols):
+            table.auto_set_column_width(i)
+
+        self.axes.add_table(table)
+        self.parent.redraw_plot()
+
+
+if __name__ == '__main__':
+    print('Please run rtlsdr_scan.py')
+    exit(1)
@@ -23,7 +23,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-import threading
 import time
 
 from matplotlib import cm, patheffects
@@ -40,8 +39,10 @@ import numpy
 from rtlsdr_scanner.constants import Markers, PlotFunc
 from rtlsdr_scanner.events import EventThread, Event, post_event
 from rtlsdr_scanner.misc import format_time, format_precision
-from rtlsdr_scanner.spectrum import split_spectrum, Measure, smooth_spectrum, Extent, \
+from rtlsdr_scanner.plot_worker import PlotWorker, PlotJob
+from rtlsdr_scanner.spectrum import Measure, smooth_spectrum, Extent, \
     diff_spectrum, get_peaks
+from rtlsdr_scanner.tiles import TilePyramid
 from rtlsdr_scanner.utils_mpl import utc_to_mpl
 
 
@@ -53,6 +54,7 @@ class Spectrogram:
         self.data = [[], [], []]
         self.axes = None
         self.plot = None
+        self.pyramid = None
         self.extent = None
         self.bar = None
         self.barBase = None
@@ -62,7 +64,7 @@ class Spectrogram:
         self.overflow = {'left': [],
                          'right': []}
 
-        self.threadPlot = None
+        self.worker = PlotWorker()
         self.__setup_plot()
         self.set_grid(self.settings.grid)
 
@@ -83,6 +85,8 @@ class Spectrogram:
         self.axes.set_xlim(self.settings.start, self.settings.stop)
         now = time.time()
         self.axes.set_ylim(utc_to_mpl(now), utc_to_mpl(now - 10))
+        self.axes.callbacks.connect('xlim_changed', self.__on_limits)
+        self.axes.callbacks.connect('ylim_changed', self.__on_limits)
 
         self.bar = self.figure.add_subplot(gs[1])
         norm = Normalize(vmin=-50, vmax=0)
@@ -149,6 +153,9 @@ class Spectrogram:
         for label in self.overflowLabels.values():
             self.axes.add_artist(label)
 
+    def __on_limits(self, _axes):
+        self.update_tile()
+
     def __clear_overflow(self):
         for label in self.overflowLabels:
             self.overflow[label] = []
@@ -220,7 +227,7 @@ class Spectrogram:
 
     def scale_plot(self, force=False):
         if self.figure is not None and self.plot is not None:
-            extent = self.plot.get_extent()
+            extent = self.pyramid.get_extent()
             if self.settings.autoF or force:
                 if extent[0] == extent[1]:
                     extent[1] += 1
@@ -235,6 +242,23 @@ class Spectrogram:
             if self.settings.autoT or force:
                 self.axes.set_ylim(extent[2], extent[3])
 
+    def get_tile(self, force=False):
+        bbox = self.axes.bbox
+        return self.pyramid.get_tile(self.axes.get_xlim(),
+                                     self.axes.get_ylim(),
+                                     (bbox.width, bbox.height),
+                                     force)
+
+    def update_tile(self):
+        plot = self.plot
+        if plot is None or self.pyramid is None:
+            return
+        tile = self.get_tile()
+        if tile is not None:
+            data, extent = tile
+            plot.set_data(data)
+            plot.set_extent(extent)
+
     def redraw_plot(self):
         if self.figure is not None:
             post_event(self.notify, EventThread(Event.DRAW))
@@ -249,20 +273,19 @@ class Spectrogram:
         return self.barBase
 
     def get_plot_thread(self):
-        return self.threadPlot
+        return self.worker.get_job()
 
     def set_title(self, title):
         self.axes.set_title(title, fontsize='medium')
 
     def set_plot(self, spectrum, extent, annotate=False):
         self.extent = extent
-        self.threadPlot = ThreadPlot(self, self.settings,
-                                     self.axes,
-                                     spectrum,
-                                     self.extent,
-                                     self.barBase,
-                                     annotate)
-        self.threadPlot.start()
+        return self.worker.submit(JobPlot(self, self.settings,
+                                          self.axes,
+                                          spectrum,
+                                          self.extent,
+                                          self.barBase,
+                                          annotate))
 
     def clear_plots(self):
         children = self.axes.get_children()
@@ -289,15 +312,15 @@ class Spectrogram:
             pass
 
     def close(self):
+        self.worker.stop()
         self.figure.clear()
         self.figure = None
 
 
-class ThreadPlot(threading.Thread):
+class JobPlot(PlotJob):
     def __init__(self, parent, settings, axes, data, extent,
                  barBase, annotate):
-        threading.Thread.__init__(self)
-        self.name = "Plot"
+        PlotJob.__init__(self)
         self.parent = parent
         self.settings = settings
         self.axes = axes
@@ -308,7 +331,6 @@ class ThreadPlot(threading.Thread):
 
     def run(self):
         if self.data is None:
-            self.parent.threadPlot = None
             return
         peakF, peakL, peakT = 0, 0, 0
         total = len(self.data)
@@ -329,30 +351,24 @@ class ThreadPlot(threading.Thread):
             self.parent.scale_plot()
             self.parent.redraw_plot()
 
-        self.parent.threadPlot = None
-
     def __plot(self, spectrum):
         width = len(spectrum[min(self.data)])
         height = len(spectrum)
-        c = numpy.ma.masked_all((height, width))
-        self.parent.clear_plots()
-        j = height
-        for ys in reversed(spectrum):
-            j -= 1
-            _xs, zs = split_spectrum(spectrum[ys])
-            for i in range(len(zs)):
-                try:
-                    c[j, i] = zs[i]
-                except IndexError:
-                    continue
+        c = numpy.full((height, width), numpy.nan, dtype=numpy.float32)
+        for j, ys in enumerate(spectrum):
+            zs = list(spectrum[ys].values())[:width]
+            c[j, :len(zs)] = zs
 
-        norm = None
-        if not self.settings.autoL:
+        if self.settings.autoL:
+            minY, maxY = self.extent.get_l()
+        else:
             minY, maxY = self.barBase.get_clim()
-            norm = Normalize(vmin=minY, vmax=maxY)
+        norm = Normalize(vmin=minY, vmax=maxY)
 
-        extent = self.extent.get_ft()
-        self.parent.plot = self.axes.imshow(c, aspect='auto',
+        self.parent.pyramid = TilePyramid(c, self.extent.get_ft())
+        tile, extent = self.parent.get_tile(True)
+        self.parent.clear_plots()
+        self.parent.plot = self.axes.imshow(tile, aspect='auto',
                                             extent=extent,
                                             norm=norm,
                                             cmap=cm.get_cmap(self.settings.colourMap),
@@ -406,11 +422,11 @@ class ThreadPlot(threading.Thread):
                            path_effects=[effect], gid='peak')
 
     def __plot_peaks(self):
-        sweep, indices = get_peaks(self.data, self.settings.peaksThres)
+        peaks = get_peaks(self.data, self.settings)
         lastTime = utc_to_mpl(max(self.data))
 
-        for i in indices:
-            self.axes.plot(sweep.keys()[i], lastTime,
+        if len(peaks):
+            self.axes.plot(peaks['freq'], [lastTime] * len(peaks),
                            linestyle='None',
                            marker='+', markersize=10, color='r',
                            gid='peakThres')
@@ -22,13 +22,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
-import threading
 
 from matplotlib.font_manager import FontProperties
 from matplotlib.table import Table
 
 from rtlsdr_scanner.events import post_event, EventThread, Event
 from rtlsdr_scanner.misc import format_time, format_precision
+from rtlsdr_scanner.plot_worker import PlotWorker, PlotJob
 from rtlsdr_scanner.utils_mpl import find_artists, set_table_colour
 
 
@@ -38,7 +38,7 @@ class PlotterStatus:
         self.figure = figure
         self.settings = settings
         self.axes = None
-        self.threadPlot = None
+        self.worker = PlotWorker()
         self.barBase = None
         self.__setup_plot()
         self.set_grid(self.settings.grid)
@@ -71,17 +71,14 @@ class PlotterStatus:
         return self.barBase
 
     def get_plot_thread(self):
-        return self.threadPlot
+        return self.worker.get_job()
 
     def set_title(self, title):
         self.axes.set_title(title, fontsize='medium')
 
     def set_plot(self, spectrum, extent, _annotate=False):
-        self.threadPlot = ThreadPlot(self, self.settings, self.axes,
-                                     spectrum, extent)
-        self.threadPlot.start()
-
-        return self.threadPlot
+        return self.worker.submit(JobPlot(self, self.settings, self.axes,
+                                          spectrum, extent))
 
     def clear_plots(self):
         table = find_artists(self.figure, 'table')
@@ -99,14 +96,14 @@ class PlotterStatus:
             self.redraw_plot()
 
     def close(self):
+        self.worker.stop()
         self.figure.clear()
         self.figure = None
 
 
-class ThreadPlot(threading.Thread):
+class JobPlot(PlotJob):
     def __init__(self, parent, settings, axes, data, extent):
-        threading.Thread.__init__(self)
-        self.name = "Plot"
+        PlotJob.__init__(self)
         self.parent = parent
         self.settings = settings
         self.axes = axes
@@ -177,8 +174,6 @@ class ThreadPlot(threading.Thread):
         self.axes.add_table(table)
         self.parent.redraw_plot()
 
-        self.parent.threadPlot = None
-
 
 if __name__ == '__main__':
     print('Please run rtlsdr_scan.py')
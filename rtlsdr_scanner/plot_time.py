@@ -22,12 +22,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
-import threading
 import time
 
 from matplotlib.ticker import ScalarFormatter, AutoMinorLocator
 
+from rtlsdr_scanner.constants import Timeline
 from rtlsdr_scanner.events import post_event, EventThread, Event
+from rtlsdr_scanner.misc import parse_bands, format_band
+from rtlsdr_scanner.plot_worker import PlotWorker, PlotJob
+from rtlsdr_scanner.spectrum import SweepStats
 from rtlsdr_scanner.utils_mpl import utc_to_mpl, set_date_ticks
 
 
@@ -38,8 +41,10 @@ class PlotterTime:
         self.figure = figure
         self.settings = settings
         self.plot = None
+        self.plotKey = None
         self.axes = None
-        self.threadPlot = None
+        self.stats = SweepStats()
+        self.worker = PlotWorker()
 
         self.__setup_plot()
         self.set_grid(self.settings.grid)
@@ -86,17 +91,14 @@ class PlotterTime:
         return self.barBase
 
     def get_plot_thread(self):
-        return self.threadPlot
+        return self.worker.get_job()
 
     def set_title(self, title):
         self.axes.set_title(title, fontsize='medium')
 
     def set_plot(self, spectrum, extent, _annotate=False):
-        self.threadPlot = ThreadPlot(self, self.settings, self.axes,
-                                     spectrum, extent)
-        self.threadPlot.start()
-
-        return self.threadPlot
+        return self.worker.submit(JobPlot(self, self.settings, self.axes,
+                                          spectrum, extent))
 
     def redraw_plot(self):
         if self.figure is not None:
@@ -109,6 +111,11 @@ class PlotterTime:
             if child.get_gid() is not None:
                 if child.get_gid() == 'plot':
                     child.remove()
+        legend = self.axes.get_legend()
+        if legend is not None:
+            legend.remove()
+        self.plot = None
+        self.plotKey = None
 
     def set_grid(self, on):
         self.axes.grid(on)
@@ -121,14 +128,19 @@ class PlotterTime:
             self.axes.set_axis_off()
 
     def close(self):
+        self.worker.stop()
         self.figure.clear()
         self.figure = None
 
 
-class ThreadPlot(threading.Thread):
+class JobPlot(PlotJob):
+    LABELS = {Timeline.POINTS: 'Points',
+              Timeline.OCCUPANCY: 'Occupancy (%)',
+              Timeline.NOISE: 'Noise floor (dB/Hz)',
+              Timeline.POWER: 'Level (dB/Hz)'}
+
     def __init__(self, parent, settings, axes, data, extent):
-        threading.Thread.__init__(self)
-        self.name = "Plot"
+        PlotJob.__init__(self)
         self.parent = parent
         self.settings = settings
         self.axes = axes
@@ -137,23 +149,56 @@ class ThreadPlot(threading.Thread):
 
     def run(self):
         if self.data is None:
-            self.parent.threadPlot = None
             return
 
         total = len(self.data)
         if total > 0:
-            self.parent.clear_plots()
-
-            xs = [utc_to_mpl(x) for x in self.data.keys()]
-            ys = [len(sweep) for sweep in self.data.values()]
-
-            self.parent.plot = self.axes.plot(xs, ys, 'bo', gid='plot')
+            try:
+                bands = parse_bands(self.settings.bands)
+            except ValueError:
+                bands = []
+
+            mode = self.settings.timelineMode
+            self.parent.stats.update(self.data, self.settings.occupancyThres,
+                                     bands)
+            timeStamps, values = self.parent.stats.get(mode)
+            if not len(timeStamps):
+                return
+
+            if mode == Timeline.POWER and len(bands):
+                labels = [format_band(band) for band in bands]
+            else:
+                labels = [None]
+
+            xs = [utc_to_mpl(x) for x in timeStamps]
+            key = (mode, tuple(labels))
+            if self.parent.plot is not None and self.parent.plotKey == key:
+                for line, ys in zip(self.parent.plot, values.T):
+                    line.set_data(xs, ys)
+                self.axes.relim()
+            else:
+                self.__plot(mode, labels, xs, values)
+                self.parent.plotKey = key
 
             set_date_ticks(self.axes.xaxis)
             self.parent.scale_plot()
             self.parent.redraw_plot()
 
-        self.parent.threadPlot = None
+    def __plot(self, mode, labels, xs, values):
+        self.parent.clear_plots()
+        self.axes.set_ylabel(self.LABELS[mode])
+
+        plot = []
+        for label, ys in zip(labels, values.T):
+            if mode == Timeline.POINTS:
+                plot += self.axes.plot(xs, ys, 'bo', gid='plot')
+            else:
+                plot += self.axes.plot(xs, ys, '-o', markersize=3,
+                                       label=label, gid='plot')
+        if labels[0] is not None:
+            self.axes.legend(loc='upper left', fontsize='small')
+
+        self.parent.plot = plot
 
 
 if __name__ == '__main__':
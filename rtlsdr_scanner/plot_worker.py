@@ -0,0 +1,115 @@
+#
+# rtlsdr_scan
+#
+# http://eartoearoak.com/software/rtlsdr-scanner
+#
+# Copyright 2012 - 2015 Al Brown
+#
+# A frequency scanning GUI for the OsmoSDR rtl-sdr library at
+# http://sdr.osmocom.org/trac/wiki/rtl-sdr
+#
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import threading
+import traceback
+
+
+class PlotJob:
+    def __init__(self):
+        self.done = threading.Event()
+
+    def run(self):
+        pass
+
+    def skip(self):
+        self.done.set()
+
+    def is_alive(self):
+        return not self.done.is_set()
+
+    def join(self, timeout=None):
+        self.done.wait(timeout)
+
+
+class PlotWorker:
+    IDLE = 30
+
+    def __init__(self, name='Plot'):
+        self.name = name
+        self.condition = threading.Condition()
+        self.thread = None
+        self.pending = None
+        self.current = None
+        self.stopped = False
+
+    def __run(self):
+        while True:
+            with self.condition:
+                if self.pending is None and not self.stopped:
+                    self.condition.wait(self.IDLE)
+                if self.pending is None or self.stopped:
+                    self.thread = None
+                    return
+                self.current = self.pending
+                self.pending = None
+
+            try:
+                self.current.run()
+            except Exception:
+                traceback.print_exc()
+            finally:
+                with self.condition:
+                    self.current.done.set()
+                    self.current = None
+
+    def submit(self, job):
+        with self.condition:
+            if self.stopped:
+                job.skip()
+                return job
+
+            if self.pending is not None:
+                self.pending.skip()
+            self.pending = job
+
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.__run,
+                                               name=self.name)
+                self.thread.daemon = True
+                self.thread.start()
+            else:
+                self.condition.notify()
+
+        return job
+
+    def get_job(self):
+        with self.condition:
+            if self.pending is not None:
+                return self.pending
+            return self.current
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            if self.pending is not None:
+                self.pending.skip()
+                self.pending = None
+            self.condition.notify()
+
+
+if __name__ == '__main__':
+    print('Please run rtlsdr_scan.py')
+    exit(1)
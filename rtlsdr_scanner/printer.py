@@ -23,16 +23,16 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-from PIL import Image
-import matplotlib
-from matplotlib.backends.backend_agg import FigureCanvasAgg
 import wx
 
+from rtlsdr_scanner.file import render_figure
+
 
 class PrintOut(wx.Printout):
     def __init__(self, graph, filename, pageConfig):
         wx.Printout.__init__(self, title=filename)
         self.figure = graph.get_figure()
+        self.revision = graph.get_revision()
         margins = (pageConfig.GetMarginTopLeft().Get()[0],
                    pageConfig.GetMarginTopLeft().Get()[1],
                    pageConfig.GetMarginBottomRight().Get()[0],
@@ -40,28 +40,11 @@ class PrintOut(wx.Printout):
         self.margins = [v / 25.4 for v in margins]
 
     def __draw_image(self, sizeInches, ppi):
-        oldSize = self.figure.get_size_inches()
-        oldDpi = self.figure.get_dpi()
-        self.figure.set_size_inches(sizeInches)
-        self.figure.set_dpi(ppi)
-
-        canvas = FigureCanvasAgg(self.figure)
-        canvas.draw()
-        renderer = canvas.get_renderer()
-        if matplotlib.__version__ >= '1.2':
-            buf = renderer.buffer_rgba()
-        else:
-            buf = renderer.buffer_rgba(0, 0)
-        size = canvas.get_width_height()
-        image = Image.frombuffer('RGBA', size, buf, 'raw', 'RGBA', 0, 1)
-
-        self.figure.set_size_inches(oldSize)
-        self.figure.set_dpi(oldDpi)
-
-        imageWx = wx.Image(image.size[0], image.size[1])
-        imageWx.SetData(image.convert('RGB').tobytes())
+        image = render_figure(self.figure, sizeInches, ppi,
+                              revision=self.revision)
 
-        return imageWx
+        return wx.Bitmap.FromBufferRGBA(image.size[0], image.size[1],
+                                        image.tobytes())
 
     def GetPageInfo(self):
         return 1, 1, 1, 1
@@ -81,8 +64,8 @@ class PrintOut(wx.Printout):
         height = (sizePixels[1] / ppi) - self.margins[0] - self.margins[2]
         sizeInches = (width, height)
 
-        image = self.__draw_image(sizeInches, ppi)
-        dc.DrawBitmap(image.ConvertToBitmap(),
+        bitmap = self.__draw_image(sizeInches, ppi)
+        dc.DrawBitmap(bitmap,
                       self.margins[0] * ppi,
                       self.margins[1] * ppi)
 
@@ -0,0 +1,261 @@
+#
+# rtlsdr_scan
+#
+# http://eartoearoak.com/software/rtlsdr-scanner
+#
+# Copyright 2012 - 2015 Al Brown
+#
+# A frequency scanning GUI for the OsmoSDR rtl-sdr library at
+# http://sdr.osmocom.org/trac/wiki/rtl-sdr
+#
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import copy
+import glob
+from io import BytesIO
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from rtlsdr_scanner.constants import Display, PlotFunc
+from rtlsdr_scanner.file import File, open_plot, export_image
+from rtlsdr_scanner.plot_3d import Plotter3d
+from rtlsdr_scanner.plot_line import Plotter
+from rtlsdr_scanner.plot_signals import PlotterSignals
+from rtlsdr_scanner.plot_spect import Spectrogram
+from rtlsdr_scanner.plot_status import PlotterStatus
+from rtlsdr_scanner.plot_time import PlotterTime
+from rtlsdr_scanner.settings import Settings
+from rtlsdr_scanner.spectrum import Extent, reduce_points
+
+
+__sequence = None
+
+PLOTTERS = {Display.PLOT: Plotter,
+            Display.SPECT: Spectrogram,
+            Display.SURFACE: Plotter3d,
+            Display.STATUS: PlotterStatus,
+            Display.TIMELINE: PlotterTime,
+            Display.SIGNALS: PlotterSignals}
+
+
+def __init_worker():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def __set_fonts(plot, display):
+    axes = plot.get_axes()
+    if axes is not None:
+        axes.xaxis.label.set_size('small')
+        axes.yaxis.label.set_size('small')
+        if display == Display.SURFACE:
+            axes.zaxis.label.set_size('small')
+        axes.tick_params(axis='both', which='major', labelsize='small')
+    axes = plot.get_axes_bar()
+    if axes is not None:
+        axes.tick_params(axis='both', which='major', labelsize='small')
+
+
+def get_render_settings(settings=None):
+    if settings is None:
+        settings = Settings(load=False)
+    settings = copy.copy(settings)
+    settings.cfg = None
+    settings.fileHistory = None
+
+    return settings
+
+
+def create_figure(settings):
+    figure = Figure(facecolor='white',
+                    figsize=(settings.exportWidth, settings.exportHeight),
+                    dpi=settings.exportDpi)
+    FigureCanvasAgg(figure)
+
+    return figure
+
+
+def create_plotter(figure, settings, display=None):
+    if display is None:
+        display = settings.display
+    if display not in PLOTTERS:
+        raise ValueError('Display cannot be rendered')
+
+    plot = PLOTTERS[display](None, figure, settings)
+    __set_fonts(plot, display)
+    figure.subplots_adjust(top=0.85)
+
+    return plot
+
+
+def set_title(plot, settings, gain=None):
+    if gain is None:
+        if len(settings.devicesRtl) > 0:
+            gain = settings.devicesRtl[settings.indexRtl].gain
+        else:
+            gain = 0
+    plot.set_title("Frequency Spectrogram\n{} - {} MHz,"
+                   " gain = {}dB".format(settings.start, settings.stop, gain))
+
+
+def render_spectrum(filename, spectrum, settings, display=None,
+                    imageType=File.ImageType.PNG, gain=None):
+    if spectrum is None or len(spectrum) == 0:
+        return False
+
+    settings = get_render_settings(settings)
+    figure = create_figure(settings)
+    plot = create_plotter(figure, settings, display)
+    set_title(plot, settings, gain)
+
+    if settings.pointsLimit:
+        spectrum = reduce_points(spectrum, settings.pointsMax)
+    plot.scale_plot(True)
+    job = plot.set_plot(spectrum, Extent(spectrum), settings.annotate)
+    job.join()
+
+    export_image(filename, imageType, figure, settings, False)
+    plot.close()
+
+    return True
+
+
+def render_file(path, output, settings=None, display=None,
+                imageType=File.ImageType.PNG):
+    settings = get_render_settings(settings)
+    dirname, filename = os.path.split(path)
+    scanInfo, spectrum, _location = open_plot(dirname, filename)
+    if scanInfo is None:
+        return None
+
+    scanInfo.set_to_settings(settings)
+    if os.path.isdir(output):
+        name = os.path.splitext(filename)[0]
+        output = os.path.join(output,
+                              name + File.get_type_ext(imageType,
+                                                       File.Types.IMAGE))
+    if not render_spectrum(output, spectrum, settings, display, imageType,
+                           scanInfo.gain):
+        return None
+
+    return output
+
+
+def render_batch(paths, outDir, settings=None, display=None,
+                 imageType=File.ImageType.PNG, processes=None):
+    settings = get_render_settings(settings)
+    jobs = [(path, outDir, settings, display, imageType) for path in paths]
+
+    pool = multiprocessing.Pool(processes, __init_worker)
+    try:
+        results = pool.starmap(render_file, jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+    return results
+
+
+def __init_sequence(settings, extent, axes, grid, bar):
+    global __sequence
+
+    __init_worker()
+    figure = create_figure(settings)
+    plot = create_plotter(figure, settings, Display.PLOT)
+    plot.set_axes(axes)
+    plot.set_grid(grid)
+    plot.set_bar(bar)
+    __sequence = figure, plot, extent
+
+
+def __render_frame(frame):
+    timeStamp, sweep, filename, encode = frame
+    figure, plot, extent = __sequence
+    settings = plot.settings
+
+    swap = settings.plotFunc == PlotFunc.NONE and not settings.peaks
+    if not swap or not plot.update_sweep(sweep):
+        plot.set_plot({timeStamp: sweep}, extent, False).join()
+
+    data = BytesIO()
+    figure.canvas.print_png(data)
+    data = data.getvalue()
+    with open(filename, 'wb') as handle:
+        handle.write(data)
+
+    return data if encode else None
+
+
+def find_encoder():
+    return shutil.which('ffmpeg')
+
+
+def export_sequence(directory, sweeps, extent, settings, axes=True,
+                    grid=True, bar=True, video=None, frameRate=10,
+                    callback=None, processes=None):
+    settings = get_render_settings(settings)
+    frames = [(timeStamp, sweeps[timeStamp],
+               os.path.join(directory, '{}.png'.format(timeStamp)),
+               video is not None)
+              for timeStamp in sorted(sweeps)]
+
+    encoder = None
+    if video is not None:
+        encoder = subprocess.Popen([find_encoder(), '-y', '-loglevel', 'error',
+                                    '-f', 'image2pipe',
+                                    '-framerate', str(frameRate),
+                                    '-c:v', 'png', '-i', '-',
+                                    '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                                    '-c:v', 'libx264', '-pix_fmt', 'yuv420p',
+                                    video],
+                                   stdin=subprocess.PIPE)
+
+    context = multiprocessing.get_context('spawn')
+    pool = context.Pool(processes, __init_sequence,
+                        (settings, extent, axes, grid, bar))
+    count = 0
+    try:
+        for data in pool.imap(__render_frame, frames):
+            count += 1
+            if encoder is not None:
+                encoder.stdin.write(data)
+            name = frames[count - 1][2]
+            if callback is not None and not callback(count, name):
+                pool.terminate()
+                break
+    finally:
+        pool.close()
+        pool.join()
+        if encoder is not None:
+            encoder.stdin.close()
+            encoder.wait()
+
+    return count
+
+
+def find_scans(directory):
+    ext = File.get_type_ext(File.SaveType.RFS, File.Types.SAVE)
+    return sorted(glob.glob(os.path.join(directory, '*' + ext)))
+
+
+if __name__ == '__main__':
+    print('Please run rtlsdr_scan.py')
+    exit(1)
@@ -0,0 +1,98 @@
+#
+# rtlsdr_scan
+#
+# http://eartoearoak.com/software/rtlsdr-scanner
+#
+# Copyright 2012 - 2015 Al Brown
+#
+# A frequency scanning GUI for the OsmoSDR rtl-sdr library at
+# http://sdr.osmocom.org/trac/wiki/rtl-sdr
+#
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import argparse
+import os
+
+from rtlsdr_scanner.constants import Display
+from rtlsdr_scanner.file import File
+from rtlsdr_scanner.render import render_file, render_batch, find_scans, \
+    get_render_settings
+
+DISPLAYS = {'plot': Display.PLOT,
+            'spectrogram': Display.SPECT,
+            'surface': Display.SURFACE,
+            'status': Display.STATUS,
+            'timeline': Display.TIMELINE,
+            'signals': Display.SIGNALS}
+
+
+def __arguments():
+    parser = argparse.ArgumentParser(prog="rtlsdr_scan_render.py",
+                                     description='Render scans to images'
+                                                 ' without the GUI')
+    parser.add_argument("-d", "--display", help="Display type",
+                        choices=sorted(DISPLAYS.keys()), default='plot')
+    parser.add_argument("-f", "--format", help="Image format",
+                        choices=[File.get_type_ext(i, File.Types.IMAGE)[1:]
+                                 for i in range(len(File.IMAGE))],
+                        default='png')
+    parser.add_argument("-W", "--width", help="Image width (inches)",
+                        type=float, default=None)
+    parser.add_argument("-H", "--height", help="Image height (inches)",
+                        type=float, default=None)
+    parser.add_argument("-r", "--dpi", help="Image DPI", type=int,
+                        default=None)
+    parser.add_argument("-j", "--jobs", help="Number of processes",
+                        type=int, default=None)
+    parser.add_argument("input", help="Scan file or directory of scans")
+    parser.add_argument("output", help="Image file or directory", nargs='?')
+    m_args = parser.parse_args()
+
+    return m_args
+
+
+if __name__ == '__main__':
+    args = __arguments()
+
+    settings = get_render_settings()
+    if args.width is not None:
+        settings.exportWidth = args.width
+    if args.height is not None:
+        settings.exportHeight = args.height
+    if args.dpi is not None:
+        settings.exportDpi = args.dpi
+    display = DISPLAYS[args.display]
+    imageType = File.get_type_index('.' + args.format, File.Types.IMAGE)
+
+    if os.path.isdir(args.input):
+        output = args.output if args.output is not None else args.input
+        if not os.path.isdir(output):
+            os.makedirs(output)
+        paths = find_scans(args.input)
+        results = render_batch(paths, output, settings, display,
+                               imageType, args.jobs)
+        failed = results.count(None)
+        print('Rendered {} of {} scans'.format(len(results) - failed,
+                                              len(results)))
+    else:
+        output = args.output
+        if output is None:
+            output = os.path.splitext(args.input)[0] + '.' + args.format
+        if render_file(args.input, output, settings, display,
+                       imageType) is None:
+            print('Error: cannot render {}'.format(args.input))
+            exit(1)
+        print(output)
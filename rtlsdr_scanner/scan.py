@@ -27,6 +27,7 @@ import math
 import threading
 import time
 from collections import OrderedDict
+from queue import Queue, Empty
 
 import matplotlib
 import rtlsdr
@@ -38,17 +39,27 @@ from rtlsdr_scanner.rtltcp import RtlTcp
 
 
 class ThreadScan(threading.Thread):
-    def __init__(self, notify, queue, sdr, settings, device, samples, isCal):
+    def __init__(self, notify, queue, sdr, settings, device, samples, isCal,
+                 start=None, stop=None, timeStamp=None):
         threading.Thread.__init__(self)
         self.name = 'Scan'
         self.notify = notify
         self.queue = queue
         self.sdr = sdr
-        self.fstart = settings.start * 1e6
-        self.fstop = settings.stop * 1e6
+        if start is None:
+            start = settings.start
+        if stop is None:
+            stop = settings.stop
+        self.fstart = start * 1e6
+        self.fstop = stop * 1e6
+        self.timeStamp = timeStamp
         self.samples = int(samples)
         self.isCal = isCal
-        self.indexRtl = settings.indexRtl
+        self.device = device
+        if settings.devicesRtl[device].indexRtl is None:
+            self.indexRtl = settings.indexRtl
+        else:
+            self.indexRtl = settings.devicesRtl[device].indexRtl
         self.isDevice = settings.devicesRtl[device].isDevice
         self.server = settings.devicesRtl[device].server
         self.port = settings.devicesRtl[device].port
@@ -58,8 +69,8 @@ class ThreadScan(threading.Thread):
         self.cancel = False
 
         post_event(self.notify, EventThread(Event.STARTING))
-        steps = int((self.__f_stop() - self.__f_start()) / self.__f_step())
-        post_event(self.notify, EventThread(Event.STEPS, steps))
+        self.steps = int((self.__f_stop() - self.__f_start()) / self.__f_step())
+        post_event(self.notify, EventThread(Event.STEPS, self.steps))
         self.start()
 
     def __f_start(self):
@@ -104,10 +115,12 @@ class ThreadScan(threading.Thread):
         tuner = self.__rtl_setup()
         if self.sdr is None:
             return
-        post_event(self.notify, EventThread(Event.INFO, None, tuner))
+        post_event(self.notify, EventThread(Event.INFO, self.device, tuner))
 
         freq = self.__f_start()
-        timeStamp = math.floor(time.time())
+        timeStamp = self.timeStamp
+        if timeStamp is None:
+            timeStamp = math.floor(time.time())
         while freq <= self.__f_stop():
             if self.cancel:
                 post_event(self.notify, EventThread(Event.STOPPED))
@@ -116,7 +129,7 @@ class ThreadScan(threading.Thread):
             try:
                 scan = self.rtl_scan(freq)
                 if len(scan):
-                    self.queue.put([freq, (timeStamp, scan)])
+                    self.queue.put([freq, (timeStamp, scan), self.device])
                     post_event(self.notify, EventThread(Event.DATA))
                 else:
                     post_event(self.notify, EventThread(Event.ERROR, 0,
@@ -155,12 +168,97 @@ class ThreadScan(threading.Thread):
     def get_sdr(self):
         return self.sdr
 
+    def get_sdrs(self):
+        if self.sdr is None:
+            return {}
+        return {self.device: self.sdr}
+
+    def get_ranges(self):
+        return {self.device: (self.fstart / 1e6, self.fstop / 1e6)}
+
+
+class ScanCoordinator(threading.Thread):
+    TIMEOUT = 0.5
+
+    def __init__(self, notify, queue, settings, devices, samples, sdrs=None):
+        threading.Thread.__init__(self)
+        self.name = 'Coordinator'
+        self.notify = notify
+        self.events = Queue()
+        self.cancel = False
+        self.failed = False
+
+        post_event(self.notify, EventThread(Event.STARTING))
+        timeStamp = math.floor(time.time())
+        self.ranges = split_range(settings.start, settings.stop, devices)
+        if sdrs is None:
+            sdrs = {}
+        self.scans = [ThreadScan(self.events, queue, sdrs.get(device),
+                                 settings, device, samples, False,
+                                 start, stop, timeStamp)
+                      for device, (start, stop) in self.ranges.items()]
+        steps = sum(scan.steps + 1 for scan in self.scans) - 1
+        post_event(self.notify, EventThread(Event.STEPS, steps))
+        self.start()
+
+    def __abort_scans(self):
+        for scan in self.scans:
+            scan.abort()
+
+    def run(self):
+        done = 0
+        while done < len(self.scans):
+            try:
+                event = self.events.get(timeout=self.TIMEOUT)
+            except Empty:
+                if not any(scan.is_alive() for scan in self.scans):
+                    break
+                continue
+
+            status = event.data.get_status()
+            arg1 = event.data.get_arg1()
+            arg2 = event.data.get_arg2()
+            if status in [Event.FINISHED, Event.STOPPED]:
+                done += 1
+            elif status == Event.ERROR:
+                done += 1
+                if not self.failed and not self.cancel:
+                    self.failed = True
+                    self.__abort_scans()
+                    post_event(self.notify, EventThread(status, arg1, arg2))
+            elif status not in [Event.STARTING, Event.STEPS]:
+                post_event(self.notify, EventThread(status, arg1, arg2))
+
+        for scan in self.scans:
+            scan.join()
+
+        if self.cancel:
+            post_event(self.notify, EventThread(Event.STOPPED))
+        elif not self.failed:
+            post_event(self.notify, EventThread(Event.FINISHED, 0, None))
+
+    def abort(self):
+        self.cancel = True
+        self.__abort_scans()
+
+    def get_sdrs(self):
+        sdrs = {}
+        for scan in self.scans:
+            sdrs.update(scan.get_sdrs())
+
+        return sdrs
+
+    def get_ranges(self):
+        return self.ranges
+
 
 class ThreadProcess(threading.Thread):
-    def __init__(self, notify, freq, scan, cal, levelOff, nfft, overlap, winFunc):
+    def __init__(self, notify, freq, scan, cal, levelOff, nfft, overlap, winFunc,
+                 device=None):
         threading.Thread.__init__(self)
         self.name = 'ThreadProcess'
         self.notify = notify
+        self.device = device
         self.freq = freq
         self.scan = scan
         self.cal = cal
@@ -186,7 +284,18 @@ class ThreadProcess(threading.Thread):
             xr = xr + (xr * self.cal / 1e6)
             spectrum[xr] = pwr * self.levelOff
         post_event(self.notify, EventThread(Event.PROCESSED,
-                                            (timeStamp, self.freq, spectrum)))
+                                            (timeStamp, self.freq, spectrum),
+                                            self.device))
+
+
+def split_range(start, stop, devices):
+    ranges = OrderedDict()
+    width = (stop - start) / float(len(devices))
+    for i, device in enumerate(devices):
+        ranges[device] = (start + width * i, start + width * (i + 1))
+    ranges[devices[-1]] = (ranges[devices[-1]][0], stop)
+
+    return ranges
 
 
 def update_spectrum(notify, lock, start, stop, data, offset,
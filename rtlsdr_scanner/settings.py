@@ -25,9 +25,12 @@
 
 from configparser import ConfigParser
 
-import wx
+try:
+    import wx
+except ImportError:
+    wx = None
 
-from rtlsdr_scanner.constants import Display, Mode, PlotFunc
+from rtlsdr_scanner.constants import Display, Mode, PlotFunc, Timeline
 from rtlsdr_scanner.devices import DeviceRTL, format_device_rtl_name, DeviceGPS
 
 
@@ -37,7 +40,7 @@ class Settings:
 
         self.saveWarn = True
         self.backup = True
-        self.fileHistory = wx.FileHistory(5)
+        self.fileHistory = wx.FileHistory(5) if wx is not None else None
 
         self.dirScans = "."
         self.dirExport = "."
@@ -47,6 +50,11 @@ class Settings:
         self.annotate = True
         self.peaks = False
         self.peaksThres = -30
+        self.peaksAdaptive = True
+        self.peaksSnr = 10
+        self.peaksProm = 3
+        self.peaksSep = 10
+        self.trackTolerance = 25
 
         self.retainScans = True
         self.retainMax = 20
@@ -58,6 +66,13 @@ class Settings:
         self.wireframe = False
         self.pointsLimit = False
         self.pointsMax = 5000
+        self.meshLimit = True
+        self.meshMax = 20000
+        self.meshReuse = False
+        self.frameRate = 10
+        self.bands = ''
+        self.timelineMode = Timeline.POINTS
+        self.occupancyThres = -50
         self.grid = True
         self.plotFunc = PlotFunc.NONE
         self.smoothFunc = 'Hamming'
@@ -97,6 +112,7 @@ class Settings:
 
         self.gps = False
         self.gpsRetry = False
+        self.gpsRate = 1
 
         self.exportWidth = 8
         self.exportHeight = 4.5
@@ -104,10 +120,11 @@ class Settings:
 
         self.devicesRtl = []
         self.indexRtl = 0
+        self.multiDevice = False
         self.devicesGps = []
         self.indexGps = 0
 
-        if load:
+        if load and wx is not None:
             self.__load()
 
     def __clear_servers(self):
@@ -211,6 +228,13 @@ class Settings:
         self.annotate = self.cfg.ReadBool('annotate', self.annotate)
         self.peaks = self.cfg.ReadBool('peaks', self.peaks)
         self.peaksThres = self.cfg.ReadInt('peaksThres', self.peaksThres)
+        self.peaksAdaptive = self.cfg.ReadBool('peaksAdaptive',
+                                               self.peaksAdaptive)
+        self.peaksSnr = self.cfg.ReadInt('peaksSnr', self.peaksSnr)
+        self.peaksProm = self.cfg.ReadInt('peaksProm', self.peaksProm)
+        self.peaksSep = self.cfg.ReadInt('peaksSep', self.peaksSep)
+        self.trackTolerance = self.cfg.ReadInt('trackTolerance',
+                                               self.trackTolerance)
         self.retainScans = self.cfg.ReadBool('retainScans', self.retainScans)
         self.fadeScans = self.cfg.ReadBool('fadeScans', self.fadeScans)
         self.lineWidth = self.cfg.ReadFloat('lineWidth', self.lineWidth)
@@ -221,6 +245,14 @@ class Settings:
         self.wireframe = self.cfg.ReadBool('wireframe', self.wireframe)
         self.pointsLimit = self.cfg.ReadBool('pointsLimit', self.pointsLimit)
         self.pointsMax = self.cfg.ReadInt('pointsMax', self.pointsMax)
+        self.meshLimit = self.cfg.ReadBool('meshLimit', self.meshLimit)
+        self.meshMax = self.cfg.ReadInt('meshMax', self.meshMax)
+        self.meshReuse = self.cfg.ReadBool('meshReuse', self.meshReuse)
+        self.frameRate = self.cfg.ReadInt('frameRate', self.frameRate)
+        self.bands = self.cfg.Read('bands', self.bands)
+        self.timelineMode = self.cfg.ReadInt('timelineMode', self.timelineMode)
+        self.occupancyThres = self.cfg.ReadInt('occupancyThres',
+                                               self.occupancyThres)
         self.grid = self.cfg.ReadBool('grid', self.grid)
         self.plotFunc = self.cfg.ReadInt('plotFunc', self.plotFunc)
         self.smoothFunc = self.cfg.Read('smoothFunc', self.smoothFunc)
@@ -251,11 +283,13 @@ class Settings:
         self.alertLevel = self.cfg.ReadFloat('alertLevel', self.alertLevel)
         self.gps = self.cfg.ReadBool('gps', self.gps)
         self.gpsRetry = self.cfg.ReadBool('gpsRetry', self.gpsRetry)
+        self.gpsRate = self.cfg.ReadInt('gpsRate', self.gpsRate)
         self.exportWidth = self.cfg.ReadFloat('exportWidth', self.exportWidth)
         self.exportHeight = self.cfg.ReadFloat('exportHeight', self.exportHeight)
         self.exportDpi = self.cfg.ReadInt('exportDpi', self.exportDpi)
         self.indexRtl = self.cfg.ReadInt('index', self.indexRtl)
         self.indexRtl = self.cfg.ReadInt('indexRtl', self.indexRtl)
+        self.multiDevice = self.cfg.ReadBool('multiDevice', self.multiDevice)
         self.indexGps = self.cfg.ReadInt('indexGps', self.indexGps)
         self.__load_devices_rtl()
         self.__load_devices_gps()
@@ -321,6 +355,11 @@ class Settings:
         self.cfg.WriteBool('annotate', self.annotate)
         self.cfg.WriteBool('peaks', self.peaks)
         self.cfg.WriteInt('peaksThres', self.peaksThres)
+        self.cfg.WriteBool('peaksAdaptive', self.peaksAdaptive)
+        self.cfg.WriteInt('peaksSnr', self.peaksSnr)
+        self.cfg.WriteInt('peaksProm', self.peaksProm)
+        self.cfg.WriteInt('peaksSep', self.peaksSep)
+        self.cfg.WriteInt('trackTolerance', self.trackTolerance)
         self.cfg.WriteBool('retainScans', self.retainScans)
         self.cfg.WriteBool('fadeScans', self.fadeScans)
         self.cfg.WriteFloat('lineWidth', self.lineWidth)
@@ -331,6 +370,13 @@ class Settings:
         self.cfg.WriteBool('wireframe', self.wireframe)
         self.cfg.WriteBool('pointsLimit', self.pointsLimit)
         self.cfg.WriteInt('pointsMax', self.pointsMax)
+        self.cfg.WriteBool('meshLimit', self.meshLimit)
+        self.cfg.WriteInt('meshMax', self.meshMax)
+        self.cfg.WriteBool('meshReuse', self.meshReuse)
+        self.cfg.WriteInt('frameRate', self.frameRate)
+        self.cfg.Write('bands', self.bands)
+        self.cfg.WriteInt('timelineMode', self.timelineMode)
+        self.cfg.WriteInt('occupancyThres', self.occupancyThres)
         self.cfg.WriteBool('grid', self.grid)
         self.cfg.WriteInt('plotFunc', self.plotFunc)
         self.cfg.WriteInt('smoothRatio', self.smoothRatio)
@@ -361,10 +407,12 @@ class Settings:
         self.cfg.WriteFloat('alertLevel', self.alertLevel)
         self.cfg.WriteBool('gps', self.gps)
         self.cfg.WriteBool('gpsRetry', self.gpsRetry)
+        self.cfg.WriteInt('gpsRate', self.gpsRate)
         self.cfg.WriteFloat('exportWidth', self.exportWidth)
         self.cfg.WriteFloat('exportHeight', self.exportHeight)
         self.cfg.WriteInt('exportDpi', self.exportDpi)
         self.cfg.WriteInt('indexRtl', self.indexRtl)
+        self.cfg.WriteBool('multiDevice', self.multiDevice)
         self.cfg.WriteInt('indexGps', self.indexGps)
         self.__save_devices_rtl()
         self.__save_devices_gps()
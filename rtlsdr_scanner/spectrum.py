@@ -24,13 +24,15 @@
 #
 from collections import OrderedDict
 from decimal import Decimal
-from functools import reduce
+from functools import lru_cache, reduce
+import math
 from operator import itemgetter, mul
+import threading
 
 from matplotlib.dates import seconds
 import numpy
 
-from rtlsdr_scanner.constants import WINFUNC
+from rtlsdr_scanner.constants import WINFUNC, Timeline
 from rtlsdr_scanner.misc import db_to_level, level_to_db
 from rtlsdr_scanner.utils_mpl import utc_to_mpl
 
@@ -199,6 +201,219 @@ class Measure:
         return self.obw
 
 
+class BandPower:
+    PEAK, MEAN, INTEGRATED = range(3)
+
+    def __init__(self, spectrum):
+        self.timeStamps, self.freqs, self.levels = align_spectrum(spectrum)
+        self.sums = None
+        self.integrals = None
+        self.counts = None
+
+    def calc_sums(self):
+        if self.sums is not None:
+            return
+
+        valid = numpy.isfinite(self.levels)
+        power = numpy.zeros(self.levels.shape)
+        power[valid] = 10 ** (self.levels[valid].astype(numpy.float64) / 10.)
+        if len(self.freqs) > 1:
+            widths = numpy.gradient(self.freqs) * 1e6
+        else:
+            widths = numpy.ones(len(self.freqs))
+
+        pad = ((0, 0), (1, 0))
+        self.integrals = numpy.pad(numpy.cumsum(power * widths, axis=1), pad,
+                                   'constant')
+        self.counts = numpy.pad(numpy.cumsum(valid, axis=1), pad, 'constant')
+        self.sums = numpy.pad(numpy.cumsum(power, axis=1), pad, 'constant')
+
+    def __get_indices(self, bands):
+        bands = numpy.asarray(bands, dtype=numpy.float64).reshape(-1, 2)
+        starts = numpy.searchsorted(self.freqs, bands[:, 0], 'left')
+        ends = numpy.searchsorted(self.freqs, bands[:, 1], 'right')
+
+        return starts, numpy.maximum(starts, ends)
+
+    def is_empty(self):
+        return not len(self.timeStamps)
+
+    def get_power(self, bands, mode=MEAN):
+        starts, ends = self.__get_indices(bands)
+        values = numpy.full((len(self.timeStamps), len(starts)), numpy.nan)
+
+        if mode == BandPower.PEAK:
+            for i, (start, end) in enumerate(zip(starts, ends)):
+                if end > start:
+                    values[:, i] = numpy.fmax.reduce(self.levels[:, start:end],
+                                                     axis=1)
+            return self.timeStamps, values
+
+        self.calc_sums()
+        counts = self.counts[:, ends] - self.counts[:, starts]
+        if mode == BandPower.INTEGRATED:
+            power = self.integrals[:, ends] - self.integrals[:, starts]
+        else:
+            power = self.sums[:, ends] - self.sums[:, starts]
+            power /= numpy.maximum(counts, 1)
+        valid = (counts > 0) & (power > 0)
+        values[valid] = 10 * numpy.log10(power[valid])
+
+        return self.timeStamps, values
+
+    def get_totals(self, bands):
+        _timeStamps, peaks = self.get_power(bands, BandPower.PEAK)
+        totals = [numpy.fmax.reduce(peaks, axis=0)]
+        for mode in [BandPower.MEAN, BandPower.INTEGRATED]:
+            _timeStamps, values = self.get_power(bands, mode)
+            valid = numpy.isfinite(values)
+            power = numpy.where(valid, 10 ** (values / 10.), 0).sum(axis=0)
+            counts = valid.sum(axis=0)
+            total = numpy.full(len(counts), numpy.nan)
+            total[counts > 0] = 10 * numpy.log10(power[counts > 0] /
+                                                 counts[counts > 0])
+            totals.append(total)
+
+        return totals
+
+
+class SweepStats:
+    def __init__(self):
+        self.threshold = None
+        self.bands = None
+        self.rows = OrderedDict()
+        self.keys = {}
+
+    def __calculate(self, spectrum, timeStamps):
+        power = BandPower(OrderedDict((timeStamp, spectrum[timeStamp])
+                                      for timeStamp in timeStamps))
+        if power.is_empty():
+            return
+
+        levels = power.levels
+        counts = numpy.isfinite(levels).sum(axis=1)
+        with numpy.errstate(invalid='ignore'):
+            above = (levels > self.threshold).sum(axis=1)
+        occupancy = above * 100. / counts
+        noise = numpy.nanmedian(levels, axis=1)
+        bands = self.bands
+        if not len(bands):
+            bands = [(power.freqs[0], power.freqs[-1])]
+        _timeStamps, powers = power.get_power(bands)
+
+        for i, timeStamp in enumerate(power.timeStamps):
+            sweep = spectrum[timeStamp]
+            self.rows[timeStamp] = (len(sweep),
+                                    occupancy[i], noise[i], powers[i])
+            self.keys[timeStamp] = get_sweep_key(sweep)
+
+    def update(self, spectrum, threshold, bands):
+        if threshold != self.threshold or bands != self.bands:
+            self.threshold = threshold
+            self.bands = bands
+            self.rows.clear()
+            self.keys.clear()
+
+        for timeStamp in [timeStamp for timeStamp in self.rows
+                          if timeStamp not in spectrum]:
+            del self.rows[timeStamp]
+            del self.keys[timeStamp]
+
+        changed = [timeStamp for timeStamp, sweep in spectrum.items()
+                   if len(sweep) and
+                   self.keys.get(timeStamp) != get_sweep_key(sweep)]
+        if len(changed):
+            self.__calculate(spectrum, changed)
+
+    def get(self, mode):
+        timeStamps = sorted(self.rows)
+        if not len(timeStamps):
+            return numpy.empty(0), numpy.empty((0, 0))
+
+        if mode == Timeline.POWER:
+            values = [self.rows[timeStamp][3] for timeStamp in timeStamps]
+        else:
+            values = [[self.rows[timeStamp][mode]] for timeStamp in timeStamps]
+
+        return numpy.array(timeStamps), numpy.array(values, dtype=numpy.float64)
+
+
+class GeoIndex:
+    CELLS = 200
+
+    def __init__(self, spectrum, location, cells=CELLS):
+        self.power = None
+        self.lons = None
+        self.lats = None
+        self.fixes = None
+        self.order = None
+        self.starts = None
+
+        self.__build(spectrum, location, cells)
+
+    def __build(self, spectrum, location, cells):
+        sweeps = OrderedDict((timeStamp, sweep)
+                             for timeStamp, sweep in spectrum.items()
+                             if timeStamp in location and len(sweep))
+        if not len(sweeps):
+            return
+
+        power = BandPower(sweeps)
+        coords = numpy.array([location[timeStamp][0:2]
+                              for timeStamp in power.timeStamps],
+                             dtype=numpy.float64)
+        lats = coords[:, 0]
+        lons = coords[:, 1]
+        size = max(numpy.ptp(lats), numpy.ptp(lons)) / cells
+        if size == 0:
+            size = 1.
+        yCell = ((lats - lats.min()) / size).astype(numpy.int64)
+        xCell = ((lons - lons.min()) / size).astype(numpy.int64)
+        _keys, cellIndex = numpy.unique(yCell * (cells + 1) + xCell,
+                                        return_inverse=True)
+        numCells = cellIndex.max() + 1
+
+        self.fixes = numpy.bincount(cellIndex, minlength=numCells)
+        self.lats = numpy.bincount(cellIndex, lats, numCells) / self.fixes
+        self.lons = numpy.bincount(cellIndex, lons, numCells) / self.fixes
+
+        self.power = power
+        self.order = numpy.argsort(cellIndex, kind='mergesort')
+        self.starts = numpy.flatnonzero(numpy.diff(cellIndex[self.order],
+                                                   prepend=-1))
+
+    def is_empty(self):
+        return self.power is None
+
+    def get_extent(self):
+        if self.is_empty():
+            return None
+
+        return (self.lons.min(), self.lons.max(),
+                self.lats.min(), self.lats.max())
+
+    def get_levels(self, freqMin, freqMax, peak=False):
+        if self.is_empty():
+            return [], [], []
+
+        _timeStamps, peaks = self.power.get_power([(freqMin, freqMax)],
+                                                  BandPower.PEAK)
+        peaks = peaks[self.order, 0]
+        if peak:
+            levels = numpy.fmax.reduceat(peaks, self.starts)
+        else:
+            valid = numpy.isfinite(peaks)
+            sums = numpy.add.reduceat(numpy.where(valid, peaks, 0),
+                                      self.starts)
+            counts = numpy.add.reduceat(valid.astype(numpy.int64),
+                                        self.starts)
+            with numpy.errstate(invalid='ignore', divide='ignore'):
+                levels = sums / counts
+        valid = numpy.isfinite(levels)
+
+        return self.lons[valid], self.lats[valid], levels[valid]
+
+
 def count_points(spectrum):
     points = 0
     for timeStamp in spectrum:
@@ -265,19 +480,16 @@ def slice_spectrum(spectrum, start, end):
 def create_mesh(spectrum, mplTime):
     total = len(spectrum)
     width = len(spectrum[min(spectrum)])
-    x = numpy.empty((width, total + 1)) * numpy.nan
-    y = numpy.empty((width, total + 1)) * numpy.nan
-    z = numpy.empty((width, total + 1)) * numpy.nan
-
-    j = 1
-    for ys in spectrum:
-        time = utc_to_mpl(ys) if mplTime else ys
-        xs, zs = split_spectrum(spectrum[ys])
-        for i in range(len(xs)):
-            x[i, j] = xs[i]
-            y[i, j] = time
-            z[i, j] = zs[i]
-        j += 1
+    x = numpy.full((width, total + 1), numpy.nan)
+    y = numpy.full((width, total + 1), numpy.nan)
+    z = numpy.full((width, total + 1), numpy.nan)
+
+    for j, ys in enumerate(spectrum, 1):
+        points = spectrum[ys]
+        count = min(width, len(points))
+        x[:count, j] = list(points.keys())[:count]
+        y[:count, j] = utc_to_mpl(ys) if mplTime else ys
+        z[:count, j] = list(points.values())[:count]
 
     x[:, 0] = x[:, 1]
     if mplTime:
@@ -289,6 +501,48 @@ def create_mesh(spectrum, mplTime):
     return x, y, z
 
 
+def decimate_mesh(x, y, z, limit):
+    rows, cols = z.shape
+    scale = rows * cols / float(limit)
+    if scale <= 1:
+        return x, y, z
+
+    rStride = int(math.ceil(min(math.sqrt(scale), rows / 2.)))
+    cStride = int(math.ceil(min(scale / rStride, cols / 2.)))
+    rStride = int(math.ceil(min(scale / cStride, rows / 2.)))
+    rStride = max(rStride, 1)
+    cStride = max(cStride, 1)
+
+    rIndices = numpy.arange(0, rows, rStride)
+    cIndices = numpy.arange(0, cols, cStride)
+    z = numpy.fmax.reduceat(z, rIndices, axis=0)
+    z = numpy.fmax.reduceat(z, cIndices, axis=1)
+
+    return x[::rStride, ::cStride], y[::rStride, ::cStride], z
+
+
+def align_spectrum(spectrum):
+    timeStamps = [timeStamp for timeStamp, sweep in spectrum.items()
+                  if len(sweep)]
+    if not len(timeStamps):
+        return numpy.empty(0), numpy.empty(0), numpy.empty((0, 0))
+
+    groups = OrderedDict()
+    for row, timeStamp in enumerate(timeStamps):
+        groups.setdefault(tuple(spectrum[timeStamp]), []).append(row)
+
+    freqs = numpy.unique(numpy.concatenate([numpy.array(keys)
+                                            for keys in groups]))
+    levels = numpy.full((len(timeStamps), len(freqs)), numpy.nan,
+                        dtype=numpy.float32)
+    for keys, rows in groups.items():
+        cols = numpy.searchsorted(freqs, keys)
+        levels[numpy.ix_(rows, cols)] = [list(spectrum[timeStamps[row]].values())
+                                         for row in rows]
+
+    return numpy.array(timeStamps), freqs, levels
+
+
 def sort_spectrum(spectrum):
     newSpectrum = OrderedDict()
     for timeStamp in sorted(spectrum):
@@ -301,64 +555,563 @@ def sort_spectrum(spectrum):
     return newSpectrum
 
 
-def diff_spectrum(spectrum):
-    data = OrderedDict()
+class SpectrumCache:
+    def __init__(self, function):
+        self.function = function
+        self.lock = threading.Lock()
+        self.key = None
+        self.data = None
+
+    def get(self, spectrum):
+        key = get_spectrum_key(spectrum)
+        with self.lock:
+            if key is None or key != self.key:
+                self.data = self.function(spectrum)
+                self.key = key
+            return self.data
+
+    def clear(self):
+        with self.lock:
+            self.key = None
+            self.data = None
+
+
+def get_sweep_key(sweep):
+    return len(sweep), hash(tuple(sweep.values()))
+
+
+def get_spectrum_key(spectrum):
+    if not len(spectrum):
+        return None
+
+    return tuple((timeStamp,) + get_sweep_key(sweep)
+                 for timeStamp, sweep in spectrum.items())
+
+
+def group_sweeps(spectrum):
+    groups = OrderedDict()
     for timeStamp, sweep in spectrum.items():
-        diff = numpy.diff(sweep.values())
-        data[timeStamp] = OrderedDict(zip(sweep.keys(), diff))
+        if len(sweep):
+            groups.setdefault(tuple(sweep), []).append(timeStamp)
 
-    return data
+    for freqs, timeStamps in groups.items():
+        levels = numpy.empty((len(timeStamps), len(freqs)))
+        for row, timeStamp in enumerate(timeStamps):
+            levels[row] = numpy.fromiter(spectrum[timeStamp].values(),
+                                         dtype=numpy.float64,
+                                         count=len(freqs))
+        groups[freqs] = (timeStamps, levels)
 
+    return groups
 
-def delta_spectrum(spectrum):
+
+def __order_sweeps(spectrum, sweeps):
     data = OrderedDict()
-    if len(spectrum) > 1:
-        _t, baseline = spectrum.items()[0]
-        for timeStamp, sweep in spectrum.items()[1:]:
-            delta = [(freq, sweep[freq] - baseline.get(freq, 0))
-                     for freq in sweep.keys()]
-            data[timeStamp] = OrderedDict(delta)
-    else:
-        data = spectrum
+    for timeStamp in spectrum:
+        if timeStamp in sweeps:
+            data[timeStamp] = sweeps[timeStamp]
 
     return data
 
 
+def __diff_spectrum(spectrum):
+    sweeps = {}
+    for freqs, (timeStamps, levels) in group_sweeps(spectrum).items():
+        diff = numpy.diff(levels, axis=1)
+        for timeStamp, row in zip(timeStamps, diff.tolist()):
+            sweeps[timeStamp] = OrderedDict(zip(freqs, row))
+
+    return __order_sweeps(spectrum, sweeps)
+
+
+def __delta_spectrum(spectrum):
+    if len(spectrum) < 2:
+        return spectrum
+
+    baseTime = next(iter(spectrum))
+    baseline = spectrum[baseTime]
+    baseFreqs = numpy.fromiter(baseline.keys(), dtype=numpy.float64,
+                               count=len(baseline))
+    baseLevels = numpy.fromiter(baseline.values(), dtype=numpy.float64,
+                                count=len(baseline))
+    order = numpy.argsort(baseFreqs)
+    baseFreqs = baseFreqs[order]
+    baseLevels = baseLevels[order]
+
+    sweeps = {}
+    for freqs, (timeStamps, levels) in group_sweeps(spectrum).items():
+        if freqs == tuple(baseline):
+            delta = levels - baseLevels[numpy.argsort(order)]
+        else:
+            grid = numpy.array(freqs)
+            valid = (grid >= baseFreqs[0]) & (grid <= baseFreqs[-1])
+            delta = levels[:, valid] - numpy.interp(grid[valid], baseFreqs,
+                                                    baseLevels)
+            freqs = grid[valid].tolist()
+        for timeStamp, row in zip(timeStamps, delta.tolist()):
+            if timeStamp != baseTime:
+                sweeps[timeStamp] = OrderedDict(zip(freqs, row))
+
+    return __order_sweeps(spectrum, sweeps)
+
+
+diffCache = SpectrumCache(__diff_spectrum)
+deltaCache = SpectrumCache(__delta_spectrum)
+
+
+def diff_spectrum(spectrum):
+    return diffCache.get(spectrum)
+
+
+def delta_spectrum(spectrum):
+    return deltaCache.get(spectrum)
+
+
 def smooth_spectrum(spectrum, winFunc, ratio):
-    data = OrderedDict()
-    for timeStamp, sweep in spectrum.items():
-        if len(sweep):
-            data[timeStamp] = smooth_sweep(sweep, winFunc, ratio)
+    sweeps = {}
+    for freqs, (timeStamps, levels) in group_sweeps(spectrum).items():
+        levels = smooth_levels(levels, winFunc, ratio)
+        for timeStamp, row in zip(timeStamps, levels.tolist()):
+            sweeps[timeStamp] = OrderedDict(zip(freqs, row))
 
-    return data
+    return __order_sweeps(spectrum, sweeps)
 
 
 def smooth_sweep(sweep, winFunc, ratio):
-    pos = WINFUNC[::2].index(winFunc)
-    function = WINFUNC[1::2][pos]
-    length = len(sweep) / ratio
-    if length < 3:
-        length = 3
-    window = function(length)
-
-    data = numpy.array([x[1] for x in sweep.items()])
-    series = numpy.r_[2 * data[0] - data[length - 1::-1],
-                      data,
-                      2 * data[-1] - data[-1:-length:-1]]
-    levels = numpy.convolve(window / window.sum(), series, mode='same')
-    smoothed = levels[length:-length + 1]
+    levels = numpy.fromiter(sweep.values(), dtype=numpy.float64,
+                            count=len(sweep))
+    smoothed = smooth_levels(levels[numpy.newaxis], winFunc, ratio)[0]
 
     return OrderedDict(zip(sweep.keys(), smoothed))
 
 
-def get_peaks(spectrum, threshold):
-    sweep = OrderedDict(spectrum[max(spectrum)])
-    for freq, level in sweep.items():
-        if level < threshold:
-            del sweep[freq]
+@lru_cache(maxsize=32)
+def __get_smooth_kernel(winFunc, length, size):
+    pos = WINFUNC[::2].index(winFunc)
+    function = WINFUNC[1::2][pos]
+    window = function(length)
+    kernel = numpy.fft.rfft(window / window.sum(), size)
+    kernel.setflags(write=False)
+
+    return kernel
+
+
+def smooth_levels(levels, winFunc, ratio):
+    points = levels.shape[1]
+    length = max(int(points / ratio), 3)
+    if points < length:
+        return levels.copy()
+
+    series = numpy.hstack((2 * levels[:, :1] - levels[:, length - 1::-1],
+                           levels,
+                           2 * levels[:, -1:] - levels[:, -1:-length:-1]))
+    full = series.shape[1] + length - 1
+    size = 1 << (full - 1).bit_length()
+    kernel = __get_smooth_kernel(winFunc, length, size)
+    convolved = numpy.fft.irfft(numpy.fft.rfft(series, size, axis=1) * kernel,
+                                size, axis=1)
+    offset = (length - 1) // 2 + length
+
+    return convolved[:, offset:offset + points]
+
+
+PEAK_DTYPE = numpy.dtype([('freq', numpy.float64),
+                          ('level', numpy.float64),
+                          ('prominence', numpy.float64),
+                          ('floor', numpy.float64),
+                          ('bandwidth', numpy.float64)])
+
+
+def get_noise_floor(levels, blocks=32, percentile=20):
+    size = len(levels)
+    width = max(int(math.ceil(size / float(blocks))), 8)
+    count = int(math.ceil(size / float(width)))
+    padded = numpy.full(count * width, numpy.nan)
+    padded[:size] = levels
+    floors = numpy.nanpercentile(padded.reshape(count, width), percentile,
+                                 axis=1)
+    centres = numpy.minimum(numpy.arange(count) * width + (width - 1) / 2.,
+                            size - 1)
+
+    return numpy.interp(numpy.arange(size), centres, floors), width
+
+
+def find_peaks(freqs, levels, threshold, prominence=0, separation=0,
+               adaptive=True):
+    freqs = numpy.asarray(freqs, dtype=numpy.float64)
+    levels = numpy.asarray(levels, dtype=numpy.float64)
+    if len(levels) < 3:
+        return numpy.zeros(0, dtype=PEAK_DTYPE)
+
+    floor, width = get_noise_floor(levels)
+    if adaptive:
+        limit = floor + threshold
+    else:
+        limit = numpy.full(len(levels), float(threshold))
+
+    centre = levels[1:-1]
+    maxima = (centre > levels[:-2]) & (centre >= levels[2:]) & \
+        (centre >= limit[1:-1])
+    indices = numpy.flatnonzero(maxima) + 1
+    if not len(indices):
+        return numpy.zeros(0, dtype=PEAK_DTYPE)
+
+    padded = numpy.pad(levels, width, 'constant', constant_values=numpy.inf)
+    offsets = numpy.arange(1, width + 1)
+    windowLeft = padded[indices[:, numpy.newaxis] + width - offsets]
+    windowRight = padded[indices[:, numpy.newaxis] + width + offsets]
+    proms = levels[indices] - numpy.maximum(windowLeft.min(axis=1),
+                                            windowRight.min(axis=1))
+
+    below = levels[indices, numpy.newaxis] - 3
+    belowLeft = windowLeft < below
+    belowRight = windowRight < below
+    edgeLeft = numpy.where(belowLeft.any(axis=1),
+                           belowLeft.argmax(axis=1), width)
+    edgeRight = numpy.where(belowRight.any(axis=1),
+                            belowRight.argmax(axis=1), width)
+    lower = numpy.maximum(indices - edgeLeft, 0)
+    upper = numpy.minimum(indices + edgeRight, len(levels) - 1)
+    widths = freqs[upper] - freqs[lower]
+
+    keep = proms >= prominence
+    indices = indices[keep]
+    proms = proms[keep]
+    widths = widths[keep]
+
+    if separation > 0 and len(indices) > 1:
+        order = numpy.argsort(-levels[indices], kind='mergesort')
+        indices = indices[order]
+        proms = proms[order]
+        widths = widths[order]
+        removed = numpy.zeros(len(indices), dtype=bool)
+        for i in range(len(indices)):
+            if not removed[i]:
+                close = numpy.abs(freqs[indices] - freqs[indices[i]]) < separation
+                close[i] = False
+                removed |= close
+        order = numpy.argsort(indices[~removed])
+        indices = indices[~removed][order]
+        proms = proms[~removed][order]
+        widths = widths[~removed][order]
+
+    peaks = numpy.zeros(len(indices), dtype=PEAK_DTYPE)
+    peaks['freq'] = freqs[indices]
+    peaks['level'] = levels[indices]
+    peaks['prominence'] = proms
+    peaks['floor'] = floor[indices]
+    peaks['bandwidth'] = widths
+
+    return peaks
+
+
+def get_peaks(spectrum, settings):
+    return get_sweep_peaks(spectrum[max(spectrum)], settings)
+
+
+def get_sweep_peaks(sweep, settings):
+    freqs = numpy.fromiter(sweep.keys(), dtype=numpy.float64, count=len(sweep))
+    levels = numpy.fromiter(sweep.values(), dtype=numpy.float64,
+                            count=len(sweep))
+    if settings.peaksAdaptive:
+        threshold = settings.peaksSnr
+    else:
+        threshold = settings.peaksThres
+
+    return find_peaks(freqs, levels, threshold,
+                      settings.peaksProm, settings.peaksSep / 1000.,
+                      settings.peaksAdaptive)
+
+
+SIGNAL_DTYPE = numpy.dtype([('freq', numpy.float64),
+                            ('first', numpy.float64),
+                            ('last', numpy.float64),
+                            ('sweep', numpy.int64),
+                            ('lastSweep', numpy.int64),
+                            ('seen', numpy.int64),
+                            ('level', numpy.float64),
+                            ('maxLevel', numpy.float64),
+                            ('bandwidth', numpy.float64)])
+
+
+class SignalTracker:
+    DRIFT = 0.25
+    EXPIRE = 50
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.table = numpy.zeros(64, dtype=SIGNAL_DTYPE)
+        self.order = numpy.zeros(0, dtype=numpy.intp)
+        self.rank = numpy.zeros(0, dtype=numpy.intp)
+        self.size = 0
+        self.sweeps = 0
+        self.timeStamp = None
+        self.key = None
+
+    def __match(self, freqs, tolerance):
+        matches = numpy.full(len(freqs), -1, dtype=numpy.intp)
+        if not self.size:
+            return matches
+
+        tracked = self.table['freq'][self.order]
+        pos = numpy.searchsorted(tracked, freqs)
+        left = numpy.maximum(pos - 1, 0)
+        right = numpy.minimum(pos, self.size - 1)
+        distLeft = numpy.abs(freqs - tracked[left])
+        distRight = numpy.abs(freqs - tracked[right])
+        nearest = numpy.where(distLeft <= distRight, left, right)
+        close = numpy.minimum(distLeft, distRight) <= tolerance
+        matches[close] = self.order[nearest[close]]
+
+        return matches
+
+    def __set_rank(self):
+        self.rank = numpy.empty(self.size, dtype=numpy.intp)
+        self.rank[self.order] = numpy.arange(self.size)
+
+    def __sort(self):
+        self.order = numpy.argsort(self.table['freq'][:self.size],
+                                   kind='mergesort')
+        self.__set_rank()
+
+    def __insert(self, start):
+        signals = numpy.arange(start, self.size)
+        freqs = self.table['freq'][start:self.size]
+        signals = signals[numpy.argsort(freqs, kind='mergesort')]
+        tracked = self.table['freq'][self.order]
+        pos = numpy.searchsorted(tracked, self.table['freq'][signals],
+                                 side='right')
+        self.order = numpy.insert(self.order, pos, signals)
+        self.__set_rank()
+
+    def __expire(self):
+        keep = self.sweeps - self.table['lastSweep'][:self.size] < self.EXPIRE
+        if keep.all():
+            return
+
+        index = numpy.cumsum(keep) - 1
+        self.order = index[self.order[keep[self.order]]]
+        size = numpy.count_nonzero(keep)
+        self.table[:size] = self.table[:self.size][keep]
+        self.size = size
+        self.__set_rank()
+
+    def __is_sorted(self, signals):
+        pos = self.rank[signals]
+        freqs = self.table['freq']
+        lower = freqs[self.order[numpy.maximum(pos - 1, 0)]]
+        upper = freqs[self.order[numpy.minimum(pos + 1, self.size - 1)]]
+
+        return numpy.all((lower <= freqs[signals]) &
+                         (freqs[signals] <= upper))
+
+    def __append(self, timeStamp, peaks):
+        size = self.size + len(peaks)
+        if size > len(self.table):
+            table = numpy.zeros(max(size, len(self.table) * 2),
+                                dtype=SIGNAL_DTYPE)
+            table[:self.size] = self.table[:self.size]
+            self.table = table
+
+        signals = self.table[self.size:size]
+        signals['freq'] = peaks['freq']
+        signals['first'] = timeStamp
+        signals['last'] = timeStamp
+        signals['sweep'] = self.sweeps
+        signals['lastSweep'] = self.sweeps
+        signals['seen'] = 1
+        signals['level'] = peaks['level']
+        signals['maxLevel'] = peaks['level']
+        signals['bandwidth'] = peaks['bandwidth']
+        self.size = size
+
+    def __add(self, timeStamp, peaks, tolerance):
+        self.sweeps += 1
+        if not len(peaks):
+            self.__expire()
+            return
 
-    indices = (numpy.diff(numpy.sign(numpy.diff(sweep.values()))) < 0).nonzero()[0] + 1
-    return sweep, indices
+        matches = self.__match(peaks['freq'], tolerance)
+        matched = numpy.flatnonzero(matches >= 0)
+        matched = matched[numpy.argsort(-peaks['level'][matched],
+                                        kind='mergesort')]
+        _signals, first = numpy.unique(matches[matched], return_index=True)
+        matched = matched[first]
+        unmatched = numpy.ones(len(peaks), dtype=bool)
+        unmatched[matched] = False
+
+        signals = matches[matched]
+        update = peaks[matched]
+        table = self.table
+        table['freq'][signals] += self.DRIFT * (update['freq'] -
+                                                table['freq'][signals])
+        table['bandwidth'][signals] += self.DRIFT * (update['bandwidth'] -
+                                                     table['bandwidth'][signals])
+        table['last'][signals] = timeStamp
+        table['lastSweep'][signals] = self.sweeps
+        table['seen'][signals] += 1
+        table['level'][signals] = update['level']
+        table['maxLevel'][signals] = numpy.maximum(table['maxLevel'][signals],
+                                                   update['level'])
+
+        if len(signals) and not self.__is_sorted(signals):
+            self.__sort()
+        self.__expire()
+
+        if unmatched.any():
+            start = self.size
+            self.__append(timeStamp, peaks[unmatched])
+            self.__insert(start)
+
+    def update(self, spectrum, settings):
+        timeStamps = []
+        for timeStamp in reversed(spectrum):
+            if self.timeStamp is not None:
+                if timeStamp < self.timeStamp:
+                    break
+                if timeStamp == self.timeStamp:
+                    if get_sweep_key(spectrum[timeStamp]) != self.key:
+                        timeStamps.append(timeStamp)
+                    break
+            timeStamps.append(timeStamp)
+
+        with self.lock:
+            tolerance = settings.trackTolerance / 1000.
+            for timeStamp in reversed(timeStamps):
+                sweep = spectrum[timeStamp]
+                if len(sweep):
+                    self.__add(timeStamp, get_sweep_peaks(sweep, settings),
+                               tolerance)
+                    self.timeStamp = timeStamp
+                    self.key = get_sweep_key(sweep)
+
+    def clear(self):
+        with self.lock:
+            self.size = 0
+            self.sweeps = 0
+            self.timeStamp = None
+            self.key = None
+            self.order = numpy.zeros(0, dtype=numpy.intp)
+            self.rank = numpy.zeros(0, dtype=numpy.intp)
+
+    def get_signals(self):
+        with self.lock:
+            signals = self.table[self.order]
+            sweeps = self.sweeps - signals['sweep'] + 1
+            duty = signals['seen'] * 100. / sweeps
+
+        return signals, duty
+
+
+class SweepStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sweeps = OrderedDict()
+        self.power = None
+        self.version = 0
+
+    def __convert(self, sweep):
+        freqs = numpy.fromiter(sweep.keys(), numpy.float64, len(sweep))
+        levels = numpy.fromiter(sweep.values(), numpy.float32, len(sweep))
+        if numpy.any(freqs[1:] < freqs[:-1]):
+            order = numpy.argsort(freqs, kind='mergesort')
+            freqs = freqs[order]
+            levels = levels[order]
+        freqs.setflags(write=False)
+        levels.setflags(write=False)
+
+        return freqs, levels
+
+    def update(self, spectrum):
+        with self.lock:
+            stored = self.sweeps
+
+        timeStamps = sorted(timeStamp for timeStamp, sweep in spectrum.items()
+                            if len(sweep))
+        sweeps = OrderedDict()
+        for timeStamp in timeStamps:
+            sweep = spectrum[timeStamp]
+            entry = stored.get(timeStamp)
+            if entry is None or entry[0] is not sweep or \
+                    timeStamp == timeStamps[-1]:
+                entry = (sweep,) + self.__convert(sweep)
+            sweeps[timeStamp] = entry
+
+        power = None
+        if len(timeStamps):
+            last = timeStamps[-1]
+            power = BandPower(OrderedDict([(last, spectrum[last])]))
+            power.calc_sums()
+
+        with self.lock:
+            self.sweeps = sweeps
+            self.power = power
+            self.version += 1
+
+    def clear(self):
+        with self.lock:
+            self.sweeps = OrderedDict()
+            self.power = None
+            self.version += 1
+
+    def get_sweeps(self, begin=None, end=None):
+        with self.lock:
+            sweeps = self.sweeps
+            version = self.version
+
+        return version, [(timeStamp, entry[1], entry[2])
+                         for timeStamp, entry in sweeps.items()
+                         if (begin is None or timeStamp >= begin) and
+                         (end is None or timeStamp <= end)]
+
+    def get_latest(self):
+        with self.lock:
+            sweeps = self.sweeps
+            version = self.version
+
+        if not len(sweeps):
+            return version, []
+        timeStamp = next(reversed(sweeps))
+        entry = sweeps[timeStamp]
+
+        return version, [(timeStamp, entry[1], entry[2])]
+
+    def get_power(self, bands, mode=BandPower.MEAN):
+        with self.lock:
+            power = self.power
+            version = self.version
+
+        if power is None or power.is_empty():
+            return version, None, None
+
+        timeStamps, values = power.get_power(bands, mode)
+
+        return version, timeStamps[0], values[0]
+
+
+def slice_levels(freqs, levels, start=None, stop=None):
+    first = 0
+    last = len(freqs)
+    if start is not None:
+        first = numpy.searchsorted(freqs, start, 'left')
+    if stop is not None:
+        last = numpy.searchsorted(freqs, stop, 'right')
+
+    return freqs[first:last], levels[first:last]
+
+
+def decimate_levels(freqs, levels, points):
+    if points is None or len(freqs) <= points:
+        return freqs, levels
+
+    edges = numpy.unique(numpy.linspace(0, len(freqs), points + 1)
+                         .astype(numpy.intp))
+    starts = edges[:-1]
+    counts = numpy.diff(edges)
+    freqs = numpy.add.reduceat(freqs, starts) / counts
+    levels = numpy.maximum.reduceat(levels, starts)
+
+    return freqs, levels
 
 
 if __name__ == '__main__':
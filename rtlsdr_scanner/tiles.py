@@ -0,0 +1,134 @@
+#
+# rtlsdr_scan
+#
+# http://eartoearoak.com/software/rtlsdr-scanner
+#
+# Copyright 2012 - 2015 Al Brown
+#
+# A frequency scanning GUI for the OsmoSDR rtl-sdr library at
+# http://sdr.osmocom.org/trac/wiki/rtl-sdr
+#
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import math
+
+import numpy
+
+
+class TilePyramid:
+    TILE = 256
+
+    def __init__(self, matrix, extent):
+        self.extent = extent
+        self.levels = {}
+        self.levelsT = self.__count_levels(matrix.shape[0])
+        self.levelsF = self.__count_levels(matrix.shape[1])
+        self.key = None
+
+        base = matrix
+        for levelT in range(self.levelsT + 1):
+            if levelT:
+                base = self.__pool_rows(base)
+            level = base
+            for levelF in range(self.levelsF + 1):
+                if levelF:
+                    level = self.__pool_cols(level)
+                self.levels[(levelT, levelF)] = level
+
+    def __count_levels(self, size):
+        levels = 0
+        while size > self.TILE:
+            size = (size + 1) // 2
+            levels += 1
+
+        return levels
+
+    @staticmethod
+    def __pool_rows(matrix):
+        if matrix.shape[0] % 2:
+            pad = numpy.full((1, matrix.shape[1]), numpy.nan, matrix.dtype)
+            matrix = numpy.vstack((matrix, pad))
+
+        return numpy.fmax(matrix[0::2], matrix[1::2])
+
+    @staticmethod
+    def __pool_cols(matrix):
+        if matrix.shape[1] % 2:
+            pad = numpy.full((matrix.shape[0], 1), numpy.nan, matrix.dtype)
+            matrix = numpy.hstack((matrix, pad))
+
+        return numpy.fmax(matrix[:, 0::2], matrix[:, 1::2])
+
+    @staticmethod
+    def __get_level(cells, pixels, maxLevel):
+        if pixels < 1 or cells <= pixels:
+            return 0
+        level = int(math.floor(math.log(cells / float(pixels), 2)))
+
+        return max(0, min(level, maxLevel))
+
+    def __get_span(self, start, end, scale, size):
+        start = int(start / scale) // self.TILE * self.TILE
+        end = int(math.ceil(end / float(scale)))
+        end = -(-end // self.TILE) * self.TILE
+        start = max(0, min(start, size - 1))
+        end = max(start + 1, min(end, size))
+
+        return start, end
+
+    def get_extent(self):
+        return list(self.extent)
+
+    def get_tile(self, xLim, yLim, pixels, force=False):
+        fMin, fMax, tBottom, tTop = self.extent
+        height, width = self.levels[(0, 0)].shape
+        df = (fMax - fMin) / float(width)
+        dt = (tBottom - tTop) / float(height)
+        if df == 0 or dt == 0:
+            return self.levels[(0, 0)], self.get_extent()
+
+        xStart, xEnd = sorted(xLim)
+        yStart, yEnd = sorted(yLim)
+        colStart = max(0., (xStart - fMin) / df)
+        colEnd = min(float(width), (xEnd - fMin) / df)
+        rowStart = max(0., (yStart - tTop) / dt)
+        rowEnd = min(float(height), (yEnd - tTop) / dt)
+
+        levelF = self.__get_level(colEnd - colStart, pixels[0], self.levelsF)
+        levelT = self.__get_level(rowEnd - rowStart, pixels[1], self.levelsT)
+        scaleF = 2 ** levelF
+        scaleT = 2 ** levelT
+        level = self.levels[(levelT, levelF)]
+        rows, cols = level.shape
+        colStart, colEnd = self.__get_span(colStart, colEnd, scaleF, cols)
+        rowStart, rowEnd = self.__get_span(rowStart, rowEnd, scaleT, rows)
+
+        key = (levelT, levelF, rowStart, rowEnd, colStart, colEnd)
+        if key == self.key and not force:
+            return None
+        self.key = key
+
+        extent = [fMin + colStart * scaleF * df,
+                  fMin + colEnd * scaleF * df,
+                  tTop + rowEnd * scaleT * dt,
+                  tTop + rowStart * scaleT * dt]
+
+        return level[rowStart:rowEnd, colStart:colEnd], extent
+
+
+if __name__ == '__main__':
+    print('Please run rtlsdr_scan.py')
+    exit(1)
@@ -33,7 +33,7 @@ from matplotlib.backends.backend_wxagg import NavigationToolbar2WxAgg
 import wx
 from wx.adv import Animation, AnimationCtrl
 
-from rtlsdr_scanner.constants import Display, PlotFunc
+from rtlsdr_scanner.constants import Display, PlotFunc, TIMELINE
 from rtlsdr_scanner.dialogs_toolbars import DialogSmoothPrefs, DialogPeakThreshold
 from rtlsdr_scanner.events import Log
 from rtlsdr_scanner.misc import get_resource
@@ -362,6 +362,10 @@ class NavigationToolbar(NavigationToolbar2WxAgg):
         if dlg.ShowModal() == wx.ID_OK:
             self.panel.redraw_plot()
 
+    def __on_timeline(self, event):
+        self.settings.timelineMode = TIMELINE[1::2][event.GetSelection()]
+        self.panel.redraw_plot()
+
     def __on_colour(self, event):
         colourMap = event.GetString()
         self.settings.colourMap = colourMap
@@ -446,6 +450,15 @@ class NavigationToolbar(NavigationToolbar2WxAgg):
         self.Bind(wx.EVT_CHOICE, self.__on_colour, self.colourId)
         self.extraTools.append(colourId)
 
+    def __add_timeline(self):
+        timelineId = wx.NewId()
+        choice = wx.Choice(self, id=timelineId, choices=TIMELINE[::2])
+        choice.SetToolTip('Time line statistic')
+        choice.SetSelection(TIMELINE[1::2].index(self.settings.timelineMode))
+        self.AddControl(choice)
+        self.Bind(wx.EVT_CHOICE, self.__on_timeline, choice)
+        self.extraTools.append(timelineId)
+
     def __enable_tool(self, toolId, state):
         if toolId is not None:
             self.EnableTool(toolId, state)
@@ -585,6 +598,7 @@ class NavigationToolbar(NavigationToolbar2WxAgg):
 
         elif display == Display.TIMELINE:
             self.__add_auto_range(False, True, True)
+            self.__add_timeline()
 
         elif display == Display.PREVIEW:
             self.__add_check_tool('fade', 'Fade plots',
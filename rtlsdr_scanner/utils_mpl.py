@@ -26,13 +26,13 @@ import datetime
 import math
 import time
 
-from PIL import ImageDraw, ImageFilter, Image, ImageChops
+from PIL import Image
 from matplotlib import cm
 from matplotlib.cm import ScalarMappable
 from matplotlib.colors import LinearSegmentedColormap, Normalize
 from matplotlib.dates import date2num, AutoDateLocator, AutoDateFormatter, \
     DateFormatter, MinuteLocator
-from matplotlib.image import pil_to_array
+import numpy
 
 
 def add_colours():
@@ -99,34 +99,63 @@ def set_date_ticks(axis, auto=True):
     axis.set_major_formatter(timeFormatter)
 
 
+def __get_positions(values, imageSize, flip):
+    values = numpy.asarray(values, dtype=numpy.float64)
+    valMin = values.min()
+    valRange = values.max() - valMin
+    if valRange == 0:
+        return numpy.full(values.shape, (imageSize - 1) // 2, dtype=numpy.int64)
+
+    positions = (values - valMin) * ((imageSize - 1) / valRange)
+    if flip:
+        positions = (imageSize - 1) - positions
+
+    return positions.astype(numpy.int64)
+
+
+def __convolve(image, kernel):
+    shape = [i + k - 1 for i, k in zip(image.shape, kernel.shape)]
+    fft = numpy.fft.rfft2(image, shape) * numpy.fft.rfft2(kernel, shape)
+    full = numpy.fft.irfft2(fft, shape)
+    offY, offX = [k // 2 for k in kernel.shape]
+
+    return full[offY:offY + image.shape[0], offX:offX + image.shape[1]]
+
+
+def __create_blob(blobSize):
+    size = blobSize * 2
+    pos = numpy.arange(size) - (size - 1) / 2.
+    disk = numpy.hypot(*numpy.meshgrid(pos, pos)) <= blobSize / 2.
+    sigma = max(blobSize / 2., 0.5)
+    gauss = numpy.exp(-pos ** 2 / (2 * sigma ** 2))
+    gauss /= gauss.sum()
+    blob = __convolve(disk.astype(numpy.float64), numpy.outer(gauss, gauss))
+
+    return blob * blob
+
+
 def create_heatmap(xs, ys, imageSize, blobSize, cmap):
-    blob = Image.new('RGBA', (blobSize * 2, blobSize * 2), '#000000')
-    blob.putalpha(0)
+    imageSize = int(imageSize)
+    blobSize = max(int(blobSize), 1)
     colour = 255 / int(math.sqrt(len(xs)))
-    draw = ImageDraw.Draw(blob)
-    draw.ellipse((blobSize / 2, blobSize / 2, blobSize * 1.5, blobSize * 1.5),
-                 fill=(colour, colour, colour))
-    blob = blob.filter(ImageFilter.GaussianBlur(radius=blobSize / 2))
-    heat = Image.new('RGBA', (imageSize, imageSize), '#000000')
-    heat.putalpha(0)
-    xScale = float(imageSize - 1) / (max(xs) - min(xs))
-    yScale = float(imageSize - 1) / (min(ys) - max(ys))
-    xOff = min(xs)
-    yOff = max(ys)
-    for i in range(len(xs)):
-        xPos = int((xs[i] - xOff) * xScale)
-        yPos = int((ys[i] - yOff) * yScale)
-        blobLoc = Image.new('RGBA', (imageSize, imageSize), '#000000')
-        blobLoc.putalpha(0)
-        blobLoc.paste(blob, (xPos - blobSize, yPos - blobSize), blob)
-        heat = ImageChops.add(heat, blobLoc)
-
-    norm = Normalize(vmin=min(min(heat.getdata())),
-                     vmax=max(max(heat.getdata())))
+
+    xPos = __get_positions(xs, imageSize, False)
+    yPos = __get_positions(ys, imageSize, True)
+    counts, _yEdges, _xEdges = numpy.histogram2d(yPos, xPos,
+                                                  bins=imageSize,
+                                                  range=((0, imageSize),
+                                                         (0, imageSize)))
+    density = __convolve(counts, __create_blob(blobSize))
+    density[density < 0] = 0
+
+    heat = numpy.minimum(density * colour, 255)
+    alpha = numpy.minimum(density * 255, 255)
+
+    norm = Normalize(vmin=min(heat.min(), alpha.min()),
+                     vmax=max(heat.max(), alpha.max()))
     sm = ScalarMappable(norm, cmap)
-    heatArray = pil_to_array(heat)
-    rgba = sm.to_rgba(heatArray[:, :, 0], bytes=True)
-    rgba[:, :, 3] = heatArray[:, :, 3]
+    rgba = sm.to_rgba(heat, bytes=True)
+    rgba[:, :, 3] = alpha.astype(numpy.uint8)
     coloured = Image.fromarray(rgba, 'RGBA')
 
     return coloured